@@ -3,39 +3,74 @@ AirLens Dashboard v2
 UK Air Quality Analysis Dashboard
 """
 
-from dash import Dash, html, dcc, callback, Output, Input, State, no_update, callback_context, clientside_callback
+import logging
+
+from dash import Dash, html, dcc, callback, Output, Input, State, Patch, no_update, callback_context, clientside_callback
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from components.sidebar import create_sidebar
 from components.kpi_tiles import create_kpi_tiles
-from components.station_cards import create_station_cards_section, create_circular_gauge
+from components.station_cards import (
+    create_station_cards_section,
+    create_station_grid,
+    create_station_sort_dropdown,
+)
+from components.year_comparison import create_year_comparison_section, create_comparison_table
+from components.exceedance_calendar import create_exceedance_calendar_section
+from components.annual_compliance import create_annual_compliance_section, create_compliance_table
+from components.figures import (
+    DARK_TEMPLATE,
+    NO_DATA_FIGURE,
+    PALETTE,
+    SELECT_PROMPT_FIGURE,
+    band_figure,
+    calendar_height,
+    exceedance_calendar_figure,
+    message_figure,
+    site_colours,
+    time_series_figure,
+)
+from utils.data_cache import load_wales_data
+from utils.availability import build_availability_index
+from utils.site_store import SiteStore, date_bounds
+from utils.selection_cache import cached_select
+from utils.dashboard_bundle import bundle_request, get_dashboard_bundle
+from utils.downsample import downsample_by_site, downsample_window, points_for_width
+from utils.calendar_aggregates import MONTH_NAMES
+from utils.compliance import annual_compliance
+from utils.station_pages import StationPages
 from utils.calculations import (
-    calculate_exceedance_rosie,
-    calculate_completeness,
-    calculate_completeness_by_site,
-    calculate_summary_stats,
     get_status_class,
     format_date_range,
+    EXCEEDANCE_RULES,
     LIMITS,
-    POLLUTANT_DISPLAY_NAMES
+    POLLUTANT_DISPLAY_NAMES,
+    STANDARDS
 )
 
 
-wales_df = pd.read_csv("wales_air_quality_data_16.csv")
-wales_df["date"] = pd.to_datetime(wales_df["date"], errors="coerce")
+logging.basicConfig(level=logging.INFO)
 
-pollutant_cols = ["NO2", "PM2.5", "PM10", "O3", "SO2"]
+# Parsed frame is served from the .npy cache after the first start
+wales_df = load_wales_data("wales_air_quality_data_16.csv")
 
-# long format for filtering
-wales_df_long = wales_df.copy()
-wales_df_long = wales_df_long.melt(
-    id_vars=["date", "site", "site_id", "code"],
-    value_vars=pollutant_cols,
-    var_name="pollutants",
-    value_name="value"
-)
-wales_df_long = wales_df_long.dropna(subset=["value"])
+# site/pollutant/date availability for the filter dropdowns
+availability = build_availability_index(wales_df)
+
+# each site's rows kept contiguous and date-sorted for binary-search slicing
+store = SiteStore(wales_df)
+
+# build the derived aggregates now rather than on first request
+store.daily_cube
+store.prefix_sums
+store.quantile_sketches
+store.hourly_validity
+store.calendar_aggregates
+store.pyramid
+
+# Station cards are rendered a page at a time, neighbours in the background
+station_pages = StationPages(store, create_station_grid)
 
 
 app = Dash(__name__, suppress_callback_exceptions=True)
@@ -44,11 +79,17 @@ app.title = "AirLens · UK Air Quality"
 
 app.layout = html.Div(
     id="app-container",
-    **{"data-theme": "dark"},
+    **{"data-theme": "dark", "data-standard": "UK"},
     children=[
         # Sidebar
         create_sidebar(),
 
+        # Selection whose dashboard bundle the panels render
+        dcc.Store(id="bundle-store"),
+
+        # Exceedance tile contents for every standard, picked client-side
+        dcc.Store(id="exceedance-store"),
+
         # Main Content
         html.Div(
             id="main-content",
@@ -119,6 +160,10 @@ app.layout = html.Div(
                                 html.Div(
                                     className="card-body",
                                     children=[
+                                        # Visible x-range and width after a zoom
+                                        dcc.Store(id="chart-view-store"),
+                                        # Site of each drawn trace, for patching
+                                        dcc.Store(id="chart-traces-store"),
                                         dcc.Graph(
                                             id="time-series-chart",
                                             figure={},
@@ -130,6 +175,15 @@ app.layout = html.Div(
                             ]
                         ),
 
+                        # Exceedance Calendar
+                        create_exceedance_calendar_section(),
+
+                        # Annual Compliance
+                        create_annual_compliance_section(),
+
+                        # Year-over-Year Comparison
+                        create_year_comparison_section(),
+
                         # Bottom Row: Stats + Completeness
                         html.Div(
                             style={
@@ -297,7 +351,8 @@ app.layout = html.Div(
                                     className="card-header",
                                     children=[
                                         html.Div("Station Details",
-                                                 className="card-title")
+                                                 className="card-title"),
+                                        create_station_sort_dropdown()
                                     ]
                                 ),
                                 html.Div(
@@ -316,29 +371,30 @@ app.layout = html.Div(
 )
 
 
-@callback(
+# The standard only changes which precomputed result is shown, so the toggle
+# is resolved in the browser: it flips the buttons and the store, and tags
+# app-container so CSS shows the matching station gauges
+clientside_callback(
+    """
+    function(ukClicks, whoClicks) {
+        const triggered = dash_clientside.callback_context.triggered;
+        const standard = triggered.length &&
+            triggered[0].prop_id === "toggle-who.n_clicks" ? "WHO" : "UK";
+        return [
+            standard === "UK" ? "toggle-option active" : "toggle-option",
+            standard === "WHO" ? "toggle-option active" : "toggle-option",
+            standard,
+            standard
+        ];
+    }
+    """,
     Output("toggle-uk", "className"),
     Output("toggle-who", "className"),
     Output("threshold-store", "data"),
+    Output("app-container", "data-standard"),
     Input("toggle-uk", "n_clicks"),
-    Input("toggle-who", "n_clicks"),
-    State("threshold-store", "data")
+    Input("toggle-who", "n_clicks")
 )
-def toggle_threshold(uk_clicks, who_clicks, current):
-    """Handle WHO/UK threshold toggle."""
-    if not uk_clicks and not who_clicks:
-        return "toggle-option active", "toggle-option", "UK"
-
-    ctx = callback_context
-    if not ctx.triggered:
-        return "toggle-option active", "toggle-option", "UK"
-
-    button_id = ctx.triggered[0]['prop_id'].split('.')[0]
-
-    if button_id == "toggle-uk":
-        return "toggle-option active", "toggle-option", "UK"
-    else:
-        return "toggle-option", "toggle-option active", "WHO"
 
 
 @callback(
@@ -367,46 +423,17 @@ def toggle_theme(dark_clicks, light_clicks, current):
         return "toggle-option", "toggle-option active", "light", "light"
 
 
-def register_callbacks(app, wales_df, wales_df_long):
+def register_callbacks(app, store, availability):
     # Precomputed maps to reduce repetition and increase dashboard's speed
-
-    site_to_pollutants = (
-        wales_df_long.groupby("site")["pollutants"]
-        .apply(set)
-        .to_dict()
-    )
-
-    site_to_dates = (
-        wales_df_long.groupby("site")["date"]
-        .agg(["min", "max"])
-        .apply(lambda r: (r["min"].date(), r["max"].date()), axis=1)
-        .to_dict()
-    )
-
-    pol_to_dates = (
-        wales_df_long.groupby("pollutants")["date"]
-        .agg(["min", "max"])
-        .apply(lambda r: (r["min"].date(), r["max"].date()), axis=1)
-        .to_dict()
-    )
-
-    site_pol_to_dates = (
-        wales_df_long.groupby(["site", "pollutants"])["date"]
-        .agg(["min", "max"])
-        .apply(lambda r: (r["min"].date(), r["max"].date()), axis=1)
-        .to_dict()
-    )
-
-    pol_to_sites = (
-        wales_df_long.groupby("pollutants")["site"]
-        .apply(set)
-        .to_dict()
-    )
-
-    all_sites = sorted(wales_df_long["site"].unique())
-    all_pollutants = sorted(wales_df_long["pollutants"].unique())
-    global_min = wales_df_long["date"].min().date()
-    global_max = wales_df_long["date"].max().date()
+    site_to_pollutants = availability.site_to_pollutants
+    site_to_dates = availability.site_to_dates
+    pol_to_dates = availability.pol_to_dates
+    site_pol_to_dates = availability.site_pol_to_dates
+    pol_to_sites = availability.pol_to_sites
+    all_sites = availability.all_sites
+    all_pollutants = availability.all_pollutants
+    global_min = availability.global_min
+    global_max = availability.global_max
 
     def has_full_date_range(start_date, end_date):
         return bool(start_date) and bool(end_date)
@@ -695,58 +722,157 @@ def register_callbacks(app, wales_df, wales_df_long):
 
     @app.callback(
         Output("time-series-chart", "figure"),
+        Output("chart-traces-store", "data"),
         Input("site_drop", "value"),
         Input("pol_drop", "value"),
         Input("date_range", "start_date"),
         Input("date_range", "end_date"),
+        Input("chart-view-store", "data"),
+        State("chart-traces-store", "data"),
     )
-    def update_graph(selected_sites, pollutant, start_date, end_date):
+    def update_graph(selected_sites, pollutant, start_date, end_date, view, drawn):
         selected_sites = selected_sites or []
 
         if not selected_sites or not pollutant or not has_full_date_range(start_date, end_date):
-            fig = px.line(title="Select sites, a pollutant, and a date range")
-            fig.update_layout(
-                template="plotly_dark",
-                paper_bgcolor="rgba(0,0,0,0)",
-                plot_bgcolor="rgba(0,0,0,0)",
-                height=400)
-            return fig
-
-        start_dt = pd.to_datetime(start_date)
-        end_dt = pd.to_datetime(end_date) + \
-            pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
-
-        df = wales_df[
-            (wales_df["site"].isin(selected_sites)) &
-            (wales_df["date"] >= start_dt) &
-            (wales_df["date"] <= end_dt)
-        ].copy()
-
-        if df.empty:
-            fig = px.line(title="No data for this selection")
-            fig.update_layout(
-                template="plotly_dark",
-                paper_bgcolor="rgba(0,0,0,0)",
-                plot_bgcolor="rgba(0,0,0,0)",
-                height=400)
-            return fig
-
-        df = df.sort_values(["site", "date"])
-
-        fig = px.line(df, x="date", y=pollutant, color="site")
-        fig.update_traces(connectgaps=False)
-
-        fig.update_layout(
-            template="plotly_dark",
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            height=400,
-            xaxis_title="Date/Time",
-            yaxis_title=f"{pollutant} (µg/m³)",
-            legend_title="Site",
-            margin=dict(t=60),
-        )
-        return fig
+            return SELECT_PROMPT_FIGURE, None
+
+        # Zoom state survives re-renders until the filters change
+        revision = "|".join([pollutant, start_date, end_date] + sorted(selected_sites))
+        view = view or {}
+        max_points = points_for_width(view.get("width"))
+        start, end = date_bounds(start_date, end_date)
+
+        if view.get("revision") == revision and view.get("range"):
+            # Zoomed: only the visible window
+            start = max(start, pd.Timestamp(view["range"][0]))
+            end = min(end, pd.Timestamp(view["range"][1]))
+            zoomed = True
+        else:
+            zoomed = False
+
+        # Coarsest pre-aggregated level that still fills the span
+        level = store.pyramid.choose_level(start, end)
+        if level != "hourly":
+            subtitle = f"{level.capitalize()} means, shaded min–max range"
+        else:
+            subtitle = "Hourly readings"
+        title = f"{POLLUTANT_DISPLAY_NAMES.get(pollutant, pollutant)}<br><sup>Resolution: {subtitle}</sup>"
+
+        # Sites already drawn keep their colours and new ones take unused
+        # colours, so traces can be added and removed without recolouring
+        colours = site_colours(selected_sites, drawn and drawn.get("colours"))
+
+        def build(sites):
+            """The chart for some sites, or None if they have nothing to draw."""
+            if level != "hourly":
+                df = store.pyramid.series(sites, pollutant, start, end, level)
+                if not df["mean"].notna().any():
+                    return None
+                return band_figure(df, pollutant, colours, title, uirevision=revision)
+            if zoomed:
+                # At the chart's pixel resolution, straight from the store's arrays
+                df = downsample_window(store, sites, pollutant, start, end, max_points)
+            else:
+                # Already grouped by site and sorted by date
+                df = cached_select(store, sites, start_date, end_date)
+                # At most max_points points per site, peaks and gaps kept
+                df = downsample_by_site(df, pollutant, max_points)
+            if df.empty:
+                return None
+            return time_series_figure(df, pollutant, colours, title, uirevision=revision)
+
+        # Everything the traces depend on except which sites are drawn
+        key = "|".join([pollutant, start_date, end_date, level, str(max_points)])
+
+        if drawn and drawn["key"] == key and not zoomed:
+            # Only sites were added or removed: patch those traces alone
+            added = [s for s in selected_sites if s not in drawn["sites"]]
+            removed = set(drawn["sites"]) - set(selected_sites)
+            if not added and not removed:
+                return no_update, no_update
+
+            fig = build(added) if added else None
+            new_traces = list(fig.data) if fig else []
+            kept = [site for site in drawn["traces"] if site not in removed]
+            if kept or new_traces:
+                patched = Patch()
+                for i in reversed(range(len(drawn["traces"]))):
+                    if drawn["traces"][i] in removed:
+                        del patched["data"][i]
+                for trace in new_traces:
+                    patched["data"].append(trace.to_plotly_json())
+                patched["layout"]["uirevision"] = revision
+                return patched, {
+                    "key": key,
+                    "sites": selected_sites,
+                    "traces": kept + [trace.legendgroup for trace in new_traces],
+                    "colours": colours,
+                }
+
+        fig = build(selected_sites)
+        if fig is None:
+            return NO_DATA_FIGURE, None
+        # Which site each trace belongs to, for the next patch; a zoomed
+        # view holds only a window, so it is never patched (but its colours
+        # carry over)
+        return fig, {
+            "key": None if zoomed else key,
+            "sites": selected_sites,
+            "traces": [trace.legendgroup for trace in fig.data],
+            "colours": colours,
+        }
+
+
+# Zooming or panning the chart reports the visible x-range and pixel width;
+# the graph callback then re-renders just that window at that resolution.
+# Other relayout events (autosize, y-only zoom, legend) are ignored. Any
+# filter change drops the range, since the new chart autoranges: a range
+# kept from an earlier selection would otherwise apply again on returning
+# to it.
+clientside_callback(
+    """
+    function(relayout, sites, pollutant, startDate, endDate, figure, view) {
+        const triggered = dash_clientside.callback_context.triggered;
+        const zoomed = triggered.length &&
+            triggered[0].prop_id === "time-series-chart.relayoutData";
+        if (!zoomed) {
+            if (!view || !view.range) {
+                return dash_clientside.no_update;
+            }
+            return {range: null, width: view.width, revision: null};
+        }
+        if (!relayout) {
+            return dash_clientside.no_update;
+        }
+        let range;
+        if (relayout["xaxis.autorange"]) {
+            range = null;
+        } else if ("xaxis.range[0]" in relayout) {
+            range = [relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]];
+        } else if (relayout["xaxis.range"]) {
+            range = relayout["xaxis.range"];
+        } else {
+            return dash_clientside.no_update;
+        }
+        const chart = document.getElementById("time-series-chart");
+        const layout = (figure && figure.layout) || {};
+        return {
+            range: range,
+            width: chart ? Math.round(chart.getBoundingClientRect().width) : null,
+            revision: layout.uirevision || null
+        };
+    }
+    """,
+    Output("chart-view-store", "data"),
+    Input("time-series-chart", "relayoutData"),
+    Input("site_drop", "value"),
+    Input("pol_drop", "value"),
+    Input("date_range", "start_date"),
+    Input("date_range", "end_date"),
+    State("time-series-chart", "figure"),
+    State("chart-view-store", "data"),
+    prevent_initial_call=True
+)
 
 
 @callback(
@@ -768,6 +894,176 @@ def update_topbar(sites, pollutant, start_date, end_date):
     return stations_text, pollutant_text, period_text
 
 
+@callback(
+    Output("yoy-years", "options"),
+    Output("yoy-years", "value"),
+    Input("site_drop", "value"),
+    Input("pol_drop", "value"),
+    State("yoy-years", "value")
+)
+def update_comparison_years(sites, pollutant, current):
+    """Offer the years the selected sites measured the pollutant in."""
+    spans = [availability.site_pol_to_dates[(s, pollutant)]
+             for s in sites or [] if (s, pollutant) in availability.site_pol_to_dates]
+    if not spans:
+        return [], []
+
+    years = list(range(min(lo for lo, _ in spans).year,
+                       max(hi for _, hi in spans).year + 1))
+    options = [{"label": str(y), "value": y} for y in years]
+
+    # Keep the user's years where still available, else the latest five
+    kept = [y for y in current or [] if y in years]
+    return options, kept or years[-5:]
+
+
+def comparison_months(start_date, end_date):
+    """Months covered by the date picker in order, or None for a year or more."""
+    if not start_date or not end_date:
+        return None
+    start = pd.Timestamp(start_date).to_period("M")
+    end = pd.Timestamp(end_date).to_period("M")
+    if end < start or (end - start).n >= 11:
+        return None
+    return [p.month for p in pd.period_range(start, end, freq="M")]
+
+
+CALENDAR_PROMPT_FIGURE = message_figure(
+    "Select sites, a pollutant, and a date range", calendar_height(0))
+CALENDAR_NO_DATA_FIGURE = message_figure(
+    "No daily readings for this selection", calendar_height(0))
+
+
+@callback(
+    Output("exceedance-calendar", "figure"),
+    Input("bundle-store", "data"),
+    Input("threshold-store", "data")
+)
+def update_exceedance_calendar(request, threshold):
+    """Site × day heatmap of the active standard's daily measure over its limit."""
+    if not request:
+        return CALENDAR_PROMPT_FIGURE
+
+    pollutant = request["pollutant"]
+    standard = threshold or "UK"
+    cube = store.daily_cube
+    rule = EXCEEDANCE_RULES.get((pollutant, standard))
+    if rule is None or pollutant not in cube.pollutants:
+        return CALENDAR_NO_DATA_FIGURE
+
+    metric, limit, _ = rule
+    sites = [s for s in store.sites if s in set(request["sites"])]
+    names, index, days = cube.window(sites, request["start_date"], request["end_date"])
+    ratio = cube.daily_ratio(metric, limit, cube.pollutants.index(pollutant), index, days)
+    if not ratio.size or np.isnan(ratio).all():
+        return CALENDAR_NO_DATA_FIGURE
+
+    measure = {
+        "mean": "daily mean", "daily_mean": "daily mean", "hourly": "highest hour",
+        "daily_max": "highest hour", "8h": "highest 8h mean",
+    }[metric]
+    title = (f"{POLLUTANT_DISPLAY_NAMES.get(pollutant, pollutant)} {measure} vs "
+             f"{standard} limit ({limit} µg/m³)")
+    return exceedance_calendar_figure(names, cube.days[days][0], ratio, title)
+
+
+@callback(
+    Output("compliance-table", "children"),
+    Input("bundle-store", "data")
+)
+def update_annual_compliance(request):
+    """Per-site, per-year status against the UK annual objectives."""
+    if not request:
+        return html.Div(
+            "Select sites, a pollutant, and a date range",
+            style={"textAlign": "center",
+                   "color": "var(--text-tertiary)", "padding": "40px"}
+        )
+
+    pollutant = request["pollutant"]
+    sites = [s for s in store.sites if s in set(request["sites"])]
+    report = annual_compliance(store, sites, request["start_date"],
+                               request["end_date"], [pollutant])
+    if report.empty:
+        name = POLLUTANT_DISPLAY_NAMES.get(pollutant, pollutant)
+        return html.Div(
+            f"No UK annual objectives for {name}",
+            style={"textAlign": "center",
+                   "color": "var(--text-tertiary)", "padding": "40px"}
+        )
+    return create_compliance_table(report)
+
+
+YOY_HEIGHT = 360
+YOY_PROMPT_FIGURE = message_figure("Select sites, a pollutant and years to compare", YOY_HEIGHT)
+YOY_NO_DATA_FIGURE = message_figure("No data for these years", YOY_HEIGHT)
+
+
+@callback(
+    Output("yoy-chart", "figure"),
+    Output("yoy-table", "children"),
+    Input("site_drop", "value"),
+    Input("pol_drop", "value"),
+    Input("date_range", "start_date"),
+    Input("date_range", "end_date"),
+    Input("yoy-years", "value")
+)
+def update_year_comparison(sites, pollutant, start_date, end_date, years):
+    """Overlay the picked months across years, from the calendar aggregates."""
+    if not sites or not pollutant or not years:
+        return YOY_PROMPT_FIGURE, []
+
+    months = comparison_months(start_date, end_date)
+    aggregates = store.calendar_aggregates
+    monthly = aggregates.compare(sites, pollutant, sorted(years), months)
+
+    if monthly.empty or monthly["mean"].isna().all():
+        return YOY_NO_DATA_FIGURE, []
+
+    # Same colour for a year across sites, a different dash per site
+    fig = go.Figure(layout=go.Layout(template=DARK_TEMPLATE, height=YOY_HEIGHT))
+    dashes = ["solid", "dash", "dot", "dashdot", "longdash", "longdashdot"]
+    site_order = {site: i for i, site in enumerate(dict.fromkeys(monthly["site"]))}
+    year_order = {year: i for i, year in enumerate(sorted(years))}
+    for (site, year), rows in monthly.groupby(["site", "year"], sort=False):
+        if rows["mean"].isna().all():
+            continue
+        fig.add_trace(go.Scatter(
+            x=[MONTH_NAMES[m - 1] for m in rows["month"]],
+            y=rows["mean"],
+            mode="lines+markers",
+            name=f"{site} · {year}",
+            line=dict(color=PALETTE[year_order[year] % len(PALETTE)],
+                      dash=dashes[site_order[site] % len(dashes)]),
+            connectgaps=False,
+        ))
+
+    span = "Full year" if months is None else f"{MONTH_NAMES[months[0] - 1]}–{MONTH_NAMES[months[-1] - 1]}"
+    fig.update_layout(
+        title=f"Monthly mean {POLLUTANT_DISPLAY_NAMES.get(pollutant, pollutant)} · {span}",
+        xaxis_title="Month",
+        yaxis_title=f"{pollutant} (µg/m³)",
+        legend_title="Site · Year",
+    )
+    summary = aggregates.summarise(sites, pollutant, sorted(years), months, STANDARDS)
+    return fig, create_comparison_table(summary, list(STANDARDS))
+
+
+@callback(
+    Output("bundle-store", "data"),
+    Input("site_drop", "value"),
+    Input("pol_drop", "value"),
+    Input("date_range", "start_date"),
+    Input("date_range", "end_date")
+)
+def update_dashboard_bundle(sites, pollutant, start_date, end_date):
+    """Compute the dashboard bundle once; display callbacks only format it."""
+    request = bundle_request(sites, pollutant, start_date, end_date)
+    if request is not None:
+        get_dashboard_bundle(store, request)
+    return request
+
+
 @callback(
     Output("kpi-no2-value", "children"),
     Output("kpi-no2-subtitle", "children"),
@@ -775,40 +1071,29 @@ def update_topbar(sites, pollutant, start_date, end_date):
     Output("kpi-pm25-value", "children"),
     Output("kpi-pm25-subtitle", "children"),
     Output("kpi-pm25-container", "className"),
-    Output("kpi-exceed-value", "children"),
-    Output("kpi-exceed-unit", "children"),
-    Output("kpi-exceed-subtitle", "children"),
-    Output("kpi-exceed-container", "className"),
+    Output("exceedance-store", "data"),
     Output("kpi-complete-value", "children"),
     Output("kpi-complete-subtitle", "children"),
     Output("kpi-complete-container", "className"),
-    Input("site_drop", "value"),
-    Input("pol_drop", "value"),
-    Input("date_range", "start_date"),
-    Input("date_range", "end_date"),
-    Input("threshold-store", "data")
+    Input("bundle-store", "data")
 )
-def update_kpi_tiles(sites, pollutant, start_date, end_date, threshold_type):
+def update_kpi_tiles(request):
     """Update all KPI tiles."""
-    if not sites or not pollutant or not start_date or not end_date:
+    if not request:
         return (
             "--", "Select data to view", "kpi-tile status-good",
             "--", "Select data to view", "kpi-tile status-good",
-            "--", "days/hours", "Select data to view", "kpi-tile status-good",
+            None,
             "--", "Select data to view", "kpi-tile status-good"
         )
 
-    df_filtered = wales_df[
-        (wales_df["site"].isin(sites)) &
-        (wales_df["date"] >= start_date) &
-        (wales_df["date"] <= end_date)
-    ]
+    bundle = get_dashboard_bundle(store, request)
 
-    if df_filtered.empty:
+    if bundle.empty:
         return (
             "--", "No data available", "kpi-tile status-good",
             "--", "No data available", "kpi-tile status-good",
-            "--", "days/hours", "No data available", "kpi-tile status-good",
+            {"empty": "No data available"},
             "--", "No data available", "kpi-tile status-good"
         )
 
@@ -816,42 +1101,38 @@ def update_kpi_tiles(sites, pollutant, start_date, end_date, threshold_type):
     no2_mean = "--"
     no2_subtitle = "Not measured"
     no2_class = "kpi-tile status-good"
-    if "NO2" in df_filtered.columns:
-        no2_data = df_filtered["NO2"].dropna()
-        if len(no2_data) > 0:
-            no2_mean = round(no2_data.mean(), 1)
-            no2_subtitle = f"n = {len(no2_data)} observations"
-            no2_class = "kpi-tile status-good"
+    if "NO2" in bundle.means:
+        no2_mean = bundle.means["NO2"]['mean']
+        no2_subtitle = f"n = {bundle.means['NO2']['count']} observations"
+        no2_class = "kpi-tile status-good"
 
     # PM2.5 Mean
     pm25_mean = "--"
     pm25_subtitle = "Not measured"
     pm25_class = "kpi-tile status-good"
-    if "PM2.5" in df_filtered.columns:
-        pm25_data = df_filtered["PM2.5"].dropna()
-        if len(pm25_data) > 0:
-            pm25_mean = round(pm25_data.mean(), 1)
-            pm25_subtitle = f"n = {len(pm25_data)} observations"
-            pm25_class = "kpi-tile status-warning"
-
-    # Calculate exceedance values
-    exceed_result = calculate_exceedance_rosie(
-        df_filtered, pollutant, threshold_type)
-    exceed_val = exceed_result['value']
-    exceed_unit = "count" if exceed_result['type'] == 'count' else "μg/m³"
-    exceed_subtitle = exceed_result['label']
-
-    # Determine status
-    if exceed_result['type'] == 'count':
-        exceed_status = get_status_class(
-            exceed_val, exceed_result['limit'], is_exceedance=True)
-    else:
-        exceed_status = 'warning'
+    if "PM2.5" in bundle.means:
+        pm25_mean = bundle.means["PM2.5"]['mean']
+        pm25_subtitle = f"n = {bundle.means['PM2.5']['count']} observations"
+        pm25_class = "kpi-tile status-warning"
+
+    # Exceedance tile for each standard; the toggle picks one client-side
+    exceedance = {}
+    for standard, exceed_result in bundle.exceedance.items():
+        if exceed_result['type'] == 'count':
+            exceed_status = get_status_class(
+                exceed_result['value'], exceed_result['limit'], is_exceedance=True)
+        else:
+            exceed_status = 'warning'
 
-    exceed_class = f"kpi-tile status-{exceed_status}"
+        exceedance[standard] = {
+            "value": exceed_result['value'],
+            "unit": "count" if exceed_result['type'] == 'count' else "μg/m³",
+            "subtitle": exceed_result['label'],
+            "className": f"kpi-tile status-{exceed_status}",
+        }
 
     # Completeness
-    completeness = calculate_completeness(df_filtered, pollutant)
+    completeness = bundle.completeness
     completeness_val = f"{completeness}%"
     completeness_status = get_status_class(
         completeness, 100, is_exceedance=False)
@@ -868,11 +1149,33 @@ def update_kpi_tiles(sites, pollutant, start_date, end_date, threshold_type):
     return (
         no2_mean, no2_subtitle, no2_class,
         pm25_mean, pm25_subtitle, pm25_class,
-        exceed_val, exceed_unit, exceed_subtitle, exceed_class,
+        exceedance,
         completeness_val, completeness_subtitle, completeness_class
     )
 
 
+clientside_callback(
+    """
+    function(exceedance, standard) {
+        if (!exceedance) {
+            return ["--", "days/hours", "Select data to view", "kpi-tile status-good"];
+        }
+        const tile = exceedance[standard] || exceedance.UK;
+        if (!tile) {
+            return ["--", "days/hours", exceedance.empty, "kpi-tile status-good"];
+        }
+        return [tile.value, tile.unit, tile.subtitle, tile.className];
+    }
+    """,
+    Output("kpi-exceed-value", "children"),
+    Output("kpi-exceed-unit", "children"),
+    Output("kpi-exceed-subtitle", "children"),
+    Output("kpi-exceed-container", "className"),
+    Input("exceedance-store", "data"),
+    Input("threshold-store", "data")
+)
+
+
 @callback(
     Output("stat-mean", "children"),
     Output("stat-median", "children"),
@@ -880,23 +1183,16 @@ def update_kpi_tiles(sites, pollutant, start_date, end_date, threshold_type):
     Output("stat-min", "children"),
     Output("stat-max", "children"),
     Output("stat-iqr", "children"),
-    Input("site_drop", "value"),
-    Input("pol_drop", "value"),
-    Input("date_range", "start_date"),
-    Input("date_range", "end_date")
+    Input("bundle-store", "data")
 )
-def update_summary_stats(sites, pollutant, start_date, end_date):
+def update_summary_stats(request):
     """Update summary statistics."""
-    if not sites or not pollutant or not start_date or not end_date:
+    if not request:
         return "--", "--", "--", "--", "--", "--"
 
-    df_filtered = wales_df[
-        (wales_df["site"].isin(sites)) &
-        (wales_df["date"] >= start_date) &
-        (wales_df["date"] <= end_date)
-    ]
-
-    stats = calculate_summary_stats(df_filtered, pollutant)
+    stats = get_dashboard_bundle(store, request).summary
+    if not stats:
+        return "--", "--", "--", "--", "--", "--"
 
     return (
         stats['mean'],
@@ -911,47 +1207,36 @@ def update_summary_stats(sites, pollutant, start_date, end_date):
 @callback(
     Output("completeness-overall", "children"),
     Output("completeness-bars", "children"),
-    Input("site_drop", "value"),
-    Input("pol_drop", "value"),
-    Input("date_range", "start_date"),
-    Input("date_range", "end_date")
+    Input("bundle-store", "data")
 )
-def update_completeness(sites, pollutant, start_date, end_date):
+def update_completeness(request):
     """Update completeness panel."""
-    if not sites or not pollutant or not start_date or not end_date:
+    if not request:
         return "--", []
 
-    df_filtered = wales_df[
-        (wales_df["site"].isin(sites)) &
-        (wales_df["date"] >= start_date) &
-        (wales_df["date"] <= end_date)
-    ]
+    bundle = get_dashboard_bundle(store, request)
 
     # Overall
-    overall = calculate_completeness(df_filtered, pollutant)
-    overall_text = f"{overall}%"
+    overall_text = f"{bundle.completeness}%"
 
     # Per-site
-    site_results = calculate_completeness_by_site(
-        df_filtered, sites, pollutant)
-
     bars = []
-    for result in site_results:
+    for result in bundle.site_results:
         bars.append(
             html.Div(
                 className="completeness-item",
                 children=[
-                    html.Div(result['site'], className="completeness-label"),
+                    html.Div(result.site, className="completeness-label"),
                     html.Div(
                         className="completeness-bar-track",
                         children=[
                             html.Div(
-                                className=f"completeness-bar-fill status-{result['status']}",
-                                style={"width": f"{result['completeness']}%"}
+                                className=f"completeness-bar-fill status-{result.status}",
+                                style={"width": f"{result.completeness}%"}
                             )
                         ]
                     ),
-                    html.Div(f"{result['completeness']}%",
+                    html.Div(f"{result.completeness}%",
                              className="completeness-percentage")
                 ]
             )
@@ -960,119 +1245,65 @@ def update_completeness(sites, pollutant, start_date, end_date):
     return overall_text, bars
 
 
+# The cards carry both standards' gauges, so the standard only reaches the
+# server when it changes the order: a toggle under the name or completeness
+# orders stays in the browser and keeps the page
+clientside_callback(
+    """
+    function(standard, order, current) {
+        const ranking = order === "exceedance" ? (standard || "UK") : null;
+        return ranking === current ? dash_clientside.no_update : ranking;
+    }
+    """,
+    Output("station-sort-standard", "data"),
+    Input("threshold-store", "data"),
+    Input("station-sort", "value"),
+    State("station-sort-standard", "data")
+)
+
+
 @callback(
     Output("station-cards-container", "children"),
-    Input("site_drop", "value"),
-    Input("pol_drop", "value"),
-    Input("date_range", "start_date"),
-    Input("date_range", "end_date"),
-    Input("threshold-store", "data")
+    Output("station-page-store", "data"),
+    Output("station-page-info", "children"),
+    Output("station-page-prev", "disabled"),
+    Output("station-page-next", "disabled"),
+    Input("bundle-store", "data"),
+    Input("station-sort-standard", "data"),
+    Input("station-sort", "value"),
+    Input("station-page-prev", "n_clicks"),
+    Input("station-page-next", "n_clicks"),
+    State("station-page-store", "data")
 )
-def update_station_cards(sites, pollutant, start_date, end_date, threshold_type):
-    """Update station cards with gauges."""
-    if not sites or not pollutant or not start_date or not end_date:
+def update_station_cards(request, threshold, order, _prev, _next, page):
+    """Render the visible page of station cards; neighbours prefetch behind it."""
+    if not request:
         return html.Div(
             "Select stations and pollutant to view details",
             style={"textAlign": "center",
                    "color": "var(--text-tertiary)", "padding": "40px"}
-        )
-
-    cards = []
-
-    for site in sites:
-        site_df = wales_df[
-            (wales_df["site"] == site) &
-            (wales_df["date"] >= start_date) &
-            (wales_df["date"] <= end_date)
-        ]
-
-        if site_df.empty:
-            continue
+        ), 0, "", True, True
 
-        # Calculate metrics
-        exceed_result = calculate_exceedance_rosie(
-            site_df, pollutant, threshold_type)
-        completeness = calculate_completeness(site_df, pollutant)
+    # Paging keeps the place; a new selection, standard or order starts over
+    step = {"station-page-prev": -1, "station-page-next": 1}.get(callback_context.triggered_id)
+    page = (page or 0) + step if step else 0
 
-        # Determine colors
-        if exceed_result['type'] == 'count':
-            exceed_color = "#EF4444" if exceed_result['value'] > exceed_result['limit'] else "#10B981"
-        else:
-            exceed_color = "#F59E0B"
-
-        comp_color = "#10B981" if completeness >= 85 else "#F59E0B" if completeness >= 75 else "#EF4444"
-
-        cards.append(
-            html.Div(
-                className="station-card",
-                children=[
-                    html.Div(
-                        className="station-info",
-                        children=[
-                            html.Div(site, className="station-name"),
-                            html.Div(
-                                f"{len(site_df)} observations",
-                                className="station-meta"
-                            )
-                        ]
-                    ),
-                    html.Div(
-                        className="gauge-container",
-                        children=[
-                            html.Div(
-                                children=[
-                                    dcc.Graph(
-                                        figure=create_circular_gauge(
-                                            exceed_result['value'],
-                                            exceed_result['limit'] if exceed_result['limit'] > 0 else 100,
-                                            exceed_color,
-                                            60
-                                        ),
-                                        config={'displayModeBar': False},
-                                        style={"height": "60px",
-                                               "width": "60px"}
-                                    ),
-                                    html.Div(
-                                        POLLUTANT_DISPLAY_NAMES.get(
-                                            pollutant, pollutant),
-                                        className="gauge-label"
-                                    )
-                                ]
-                            ),
-                            html.Div(
-                                children=[
-                                    dcc.Graph(
-                                        figure=create_circular_gauge(
-                                            completeness,
-                                            100,
-                                            comp_color,
-                                            60
-                                        ),
-                                        config={'displayModeBar': False},
-                                        style={"height": "60px",
-                                               "width": "60px"}
-                                    ),
-                                    html.Div(
-                                        "Complete", className="gauge-label")
-                                ]
-                            )
-                        ]
-                    )
-                ]
-            )
-        )
-
-    if not cards:
+    children, page, pages, total = station_pages.get(
+        request, threshold or "UK", order or "name", page)
+    if not total:
         return html.Div(
             "No data available for selected filters",
             style={"textAlign": "center",
                    "color": "var(--text-tertiary)", "padding": "40px"}
-        )
+        ), 0, "", True, True
 
-    return html.Div(className="station-grid", children=cards)
+    first = page * station_pages.size + 1
+    last = min(first + station_pages.size - 1, total)
+    info = f"{first}–{last} of {total} stations · page {page + 1} of {pages}"
+    return children, page, info, page == 0, page >= pages - 1
 
 
-register_callbacks(app, wales_df, wales_df_long)
+register_callbacks(app, store, availability)
 
 if __name__ == "__main__":
     app.run(debug=True, port=8052)
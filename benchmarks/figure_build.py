@@ -0,0 +1,113 @@
+"""
+Figure Build Benchmark
+Build time and JSON payload of the time-series chart: the previous
+plotly.express path against the WebGL builders in components/figures.py
+
+Run from the project root:
+    python benchmarks/figure_build.py [path/to/wales_air_quality_data_16.csv]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import plotly.express as px
+from plotly.io.json import to_json_plotly
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from components.figures import (  # noqa: E402
+    NO_DATA_FIGURE,
+    band_figure,
+    site_colours,
+    time_series_figure,
+)
+from utils.data_cache import DATA_FILE, load_wales_data  # noqa: E402
+from utils.downsample import downsample_by_site  # noqa: E402
+from utils.site_store import SiteStore, date_bounds  # noqa: E402
+
+
+POLLUTANT = "NO2"
+REPEATS = 5
+
+
+def express_line(df, pollutant, colours):
+    """The chart as update_graph built it before: px.line, then styling."""
+    fig = px.line(df, x="date", y=pollutant, color="site",
+                  color_discrete_map=colours)
+    fig.update_traces(connectgaps=False)
+    fig.update_layout(
+        template="plotly_dark",
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        height=400,
+        title=pollutant,
+        xaxis_title="Date/Time",
+        yaxis_title=f"{pollutant} (µg/m³)",
+        legend_title="Site",
+        margin=dict(t=60),
+    )
+    return fig
+
+
+def express_empty(title):
+    fig = px.line(title=title)
+    fig.update_layout(
+        template="plotly_dark",
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        height=400)
+    return fig
+
+
+def measure(build):
+    """Best-of-REPEATS build and serialise times (ms) and payload (bytes)."""
+    build_ms, json_ms = [], []
+    for _ in range(REPEATS):
+        t = time.perf_counter()
+        fig = build()
+        build_ms.append((time.perf_counter() - t) * 1000)
+        t = time.perf_counter()
+        # Serialised the way Dash sends a callback output
+        payload = to_json_plotly({"figure": fig})
+        json_ms.append((time.perf_counter() - t) * 1000)
+    return min(build_ms), min(json_ms), len(payload.encode())
+
+
+def report(name, build):
+    build_ms, json_ms, size = measure(build)
+    print(f"{name:<44} {build_ms:9.1f} {json_ms:9.1f} {size / 1024:10.1f}")
+
+
+def main(csv_path=DATA_FILE):
+    store = SiteStore(load_wales_data(csv_path))
+    sites = list(store.sites)
+    colours = site_colours(sites)
+    first, last = store.dates.min(), store.dates.max()
+    start_date, end_date = str(first)[:10], str(last)[:10]
+
+    full = store.select(sites, start_date, end_date)[["date", "site", POLLUTANT]]
+    full = full.assign(site=full["site"].astype(str))
+    reduced = downsample_by_site(full, POLLUTANT)
+    start, end = date_bounds(start_date, end_date)
+    level = store.pyramid.choose_level(start, end)
+    bands = store.pyramid.series(sites, POLLUTANT, start, end, level)
+
+    print(f"{len(sites)} sites, {start_date} to {end_date}: {len(full)} hourly rows, "
+          f"{len(reduced)} after downsampling, {len(bands)} {level} buckets\n")
+    print(f"{'figure':<44} {'build ms':>9} {'json ms':>9} {'payload KB':>10}")
+
+    report("empty: px.line + update_layout", lambda: express_empty("No data for this selection"))
+    report("empty: cached constant", lambda: NO_DATA_FIGURE)
+    report("downsampled: px.line (SVG)", lambda: express_line(reduced, POLLUTANT, colours))
+    report("downsampled: time_series_figure (WebGL)",
+           lambda: time_series_figure(reduced, POLLUTANT, colours, POLLUTANT))
+    report("full resolution: px.line (SVG)", lambda: express_line(full, POLLUTANT, colours))
+    report("full resolution: time_series_figure (WebGL)",
+           lambda: time_series_figure(full, POLLUTANT, colours, POLLUTANT))
+    report(f"{level} bands: band_figure (WebGL)",
+           lambda: band_figure(bands, POLLUTANT, colours, POLLUTANT))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,188 @@
+"""
+Gauge Render Benchmark
+Station-card gauges as one Plotly Indicator figure each (the previous
+approach) against the CSS rings in components/station_cards.py
+
+Server build time and payload are measured here for 10, 50 and 200
+stations, three gauges per card as update_station_cards draws them (UK,
+WHO and completeness). Client render needs a browser, so with --html the
+script also writes one self-timing page per approach and station count;
+open them and read the time from the page heading.
+
+Run from the project root:
+    python benchmarks/gauge_render.py [--html OUTPUT_DIR]
+"""
+
+import html as html_escape
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import plotly
+import plotly.graph_objects as go
+from dash import dcc, html
+from plotly.io.json import to_json_plotly
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from components.station_cards import create_circular_gauge  # noqa: E402
+
+
+STATION_COUNTS = (10, 50, 200)
+REPEATS = 5
+
+
+def indicator_gauge(value, max_val, color, size=60):
+    """The gauge as it was: a go.Indicator figure in its own dcc.Graph."""
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=value,
+        number={'font': {'size': 14, 'color': '#FFFFFF'}},
+        gauge={
+            'axis': {'range': [0, max_val], 'visible': False},
+            'bar': {'color': color, 'thickness': 0.7},
+            'bgcolor': 'rgba(255,255,255,0.1)',
+            'borderwidth': 0,
+            'steps': [{'range': [0, max_val], 'color': 'rgba(255,255,255,0.05)'}],
+        }
+    ))
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font={'color': '#FFFFFF', 'family': 'Inter'},
+        height=size,
+        width=size,
+        margin=dict(l=0, r=0, t=0, b=0),
+        showlegend=False
+    )
+    return dcc.Graph(figure=fig, config={'displayModeBar': False},
+                     style={"height": f"{size}px", "width": f"{size}px"})
+
+
+def stations(n, seed=16):
+    """(UK count, WHO count, completeness) per synthetic station."""
+    rng = random.Random(seed)
+    return [(rng.randint(0, 40), rng.randint(0, 120), round(rng.uniform(60, 100), 1))
+            for _ in range(n)]
+
+
+def build_cards(gauge, readings):
+    return html.Div(className="station-grid", children=[
+        html.Div(className="station-card", children=[
+            html.Div(f"Station {i}", className="station-name"),
+            html.Div(className="gauge-container", children=[
+                gauge(uk, 18, "#EF4444" if uk > 18 else "#10B981"),
+                gauge(who, 3, "#EF4444" if who > 3 else "#10B981"),
+                gauge(complete, 100, "#10B981" if complete >= 85 else "#F59E0B"),
+            ]),
+        ])
+        for i, (uk, who, complete) in enumerate(readings)
+    ])
+
+
+def measure(gauge, readings):
+    """Best-of-REPEATS build and serialise times (ms) and payload (bytes)."""
+    build_ms, json_ms = [], []
+    for _ in range(REPEATS):
+        t = time.perf_counter()
+        cards = build_cards(gauge, readings)
+        build_ms.append((time.perf_counter() - t) * 1000)
+        t = time.perf_counter()
+        # Serialised the way Dash sends a callback output
+        payload = to_json_plotly(cards)
+        json_ms.append((time.perf_counter() - t) * 1000)
+    return min(build_ms), min(json_ms), len(payload.encode())
+
+
+def to_html(component):
+    """Static markup for the html.Div trees the ring gauges are made of."""
+    if isinstance(component, (str, int, float)):
+        return html_escape.escape(str(component))
+    if isinstance(component, (list, tuple)):
+        return "".join(to_html(c) for c in component)
+    props = component.to_plotly_json()["props"]
+    style = ";".join(
+        "".join("-" + c.lower() if c.isupper() else c for c in key) + ":" + value
+        for key, value in (props.get("style") or {}).items()
+    )
+    style = f' style="{html_escape.escape(style)}"' if style else ""
+    return (f'<div class="{props.get("className", "")}"{style}>'
+            f'{to_html(props.get("children") or [])}</div>')
+
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8">
+<link rel="stylesheet" href="{css}">
+{head}
+</head><body id="app-container" data-theme="dark" data-standard="UK">
+<h1 id="result">rendering...</h1>
+<div id="root"></div>
+<script>
+const t0 = performance.now();
+{script}
+</script></body></html>
+"""
+
+# Heading shows the time from script start to the first frame after mount
+DONE = """
+requestAnimationFrame(() => requestAnimationFrame(() => {
+    document.getElementById("result").textContent =
+        "%s: " + (performance.now() - t0).toFixed(1) + " ms";
+}));
+"""
+
+
+def write_pages(out_dir, n, readings):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    css = (ROOT / "assets" / "style.css").as_uri()
+
+    markup = to_html(build_cards(create_circular_gauge, readings))
+    ring_script = (f"document.getElementById('root').innerHTML = {json.dumps(markup)};"
+                   + DONE % f"CSS rings, {n} stations")
+    (out_dir / f"gauges_css_{n}.html").write_text(
+        PAGE.format(css=css, head="", script=ring_script), encoding="utf-8")
+
+    figures = [
+        graph.figure.to_plotly_json()
+        for card in build_cards(indicator_gauge, readings).children
+        for graph in card.children[1].children
+    ]
+    plotly_js = Path(plotly.__file__).parent / "package_data" / "plotly.min.js"
+    indicator_script = (
+        f"const figures = {to_json_plotly(figures)};\n"
+        "const root = document.getElementById('root');\n"
+        "Promise.all(figures.map(fig => {\n"
+        "    const div = document.createElement('div');\n"
+        "    root.appendChild(div);\n"
+        "    return Plotly.newPlot(div, fig.data, fig.layout, {displayModeBar: false});\n"
+        "})).then(() => {" + DONE % f"Plotly indicators, {n} stations" + "});"
+    )
+    (out_dir / f"gauges_plotly_{n}.html").write_text(
+        PAGE.format(css=css, head=f'<script src="{plotly_js.as_uri()}"></script>',
+                    script=indicator_script),
+        encoding="utf-8")
+
+
+def main(argv):
+    out_dir = Path(argv[argv.index("--html") + 1]) if "--html" in argv else None
+
+    print(f"{'gauges':<30} {'build ms':>9} {'json ms':>9} {'payload KB':>10}")
+    for n in STATION_COUNTS:
+        readings = stations(n)
+        for name, gauge in (("Plotly indicators", indicator_gauge),
+                            ("CSS rings", create_circular_gauge)):
+            build_ms, json_ms, size = measure(gauge, readings)
+            print(f"{f'{name}, {n} stations':<30} {build_ms:9.1f} {json_ms:9.1f} "
+                  f"{size / 1024:10.1f}")
+        if out_dir:
+            write_pages(out_dir, n, readings)
+
+    if out_dir:
+        print(f"\nClient render pages written to {out_dir}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,89 @@
+"""
+Shared Memory Benchmark
+Memory held by 8 worker processes that each load the data privately,
+against 8 that attach to the shared store in utils/shared_store.py
+
+Every worker is a fresh (spawned) interpreter, so nothing is shared by
+forking: a worker loads the data, builds its SiteStore, reads every
+column, then waits until all of them have done so before measuring. The
+data's cost in each worker is its PSS (shared pages split between the
+processes sharing them) after loading minus before, so the sum over the
+workers is the real total. With the shared store it should stay close to
+one copy of the data, however many workers there are. Linux only (/proc).
+
+Run from the project root:
+    python benchmarks/shared_memory.py [path/to/wales_air_quality_data_16.csv]
+"""
+
+import multiprocessing as mp
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.data_cache import DATA_FILE, load_wales_data  # noqa: E402
+from utils.process_memory import memory_mb  # noqa: E402
+from utils.site_store import SiteStore  # noqa: E402
+
+
+WORKERS = 8
+# Seconds to wait for the workers before giving up on a failed run
+TIMEOUT = 120
+
+
+def worker(csv_path, shared, ready, results):
+    before = memory_mb()
+    store = SiteStore(load_wales_data(csv_path, shared=shared))
+    # Touch every page, as the dashboard's callbacks eventually will
+    frame = store.frame
+    for column in frame.columns:
+        values = frame[column]
+        values = values.cat.codes if column == "site" else values
+        np.asarray(values).max()
+
+    # Measure only once every worker holds the data, so PSS splits the
+    # shared pages between all of them
+    ready.wait()
+    after = memory_mb()
+    results.put({key: after[key] - before[key] for key in ("rss", "pss", "private")})
+    ready.wait()
+
+
+def run(csv_path, shared):
+    ctx = mp.get_context("spawn")
+    ready = ctx.Barrier(WORKERS, timeout=TIMEOUT)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=worker, args=(csv_path, shared, ready, results))
+                 for _ in range(WORKERS)]
+    for process in processes:
+        process.start()
+    deltas = [results.get(timeout=TIMEOUT) for _ in processes]
+    for process in processes:
+        process.join()
+    return {key: sum(d[key] for d in deltas) for key in ("rss", "pss", "private")}
+
+
+def main(csv_path=DATA_FILE):
+    if memory_mb() is None or memory_mb()["pss"] is None:
+        sys.exit("Needs /proc/self/smaps_rollup (Linux 4.14+)")
+
+    # Build the bundle and the shared file up front, so no worker pays for
+    # parsing the CSV and the first shared run attaches like the rest
+    frame = load_wales_data(csv_path, shared=True)
+    one_copy = frame.memory_usage(deep=True).sum() / 1024 ** 2
+    print(f"{len(frame)} rows, one copy of the data: {one_copy:.1f} MB\n")
+
+    print(f"{f'{WORKERS} workers':<24} {'sum RSS MB':>11} {'sum PSS MB':>11} "
+          f"{'sum private MB':>15} {'PSS / copy':>11}")
+    for name, shared in (("private copies", False), ("shared store", True)):
+        total = run(csv_path, shared)
+        print(f"{name:<24} {total['rss']:11.1f} {total['pss']:11.1f} "
+              f"{total['private']:15.1f} {total['pss'] / one_copy:11.2f}")
+
+    print("\nRSS counts shared pages once per worker; PSS counts them once in total.")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
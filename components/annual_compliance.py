@@ -0,0 +1,82 @@
+"""
+Annual Compliance Component
+Per-site, per-calendar-year status against the UK annual objectives
+"""
+
+from dash import html
+
+
+METRIC_UNITS = {
+    'hourly': 'hours',
+    'daily_mean': 'days',
+    'daily_max': 'days',
+    '8h': 'days',
+}
+
+
+def create_annual_compliance_section():
+    """
+    Creates the annual compliance card (table filled by callback).
+    """
+    return html.Div(
+        className="card",
+        style={"marginTop": "24px"},
+        children=[
+            html.Div(
+                className="card-header",
+                children=[
+                    html.Div("Annual Compliance (UK Objectives)", className="card-title")
+                ]
+            ),
+            html.Div(
+                className="card-body",
+                children=[html.Div(id="compliance-table")]
+            )
+        ]
+    )
+
+
+def format_objective(row):
+    """What one report row is measured against, e.g. 'Days > 50 μg/m³ (max 35)'."""
+    if row.objective == 'annual_mean':
+        return f"Annual mean (limit {row.limit:g} μg/m³)"
+    unit = METRIC_UNITS.get(row.metric, 'days').capitalize()
+    return f"{unit} > {row.limit:g} μg/m³ (max {row.allowed:g})"
+
+
+def create_compliance_table(report):
+    """
+    Table of one row per site, year and objective.
+
+    Args:
+        report: DataFrame from annual_compliance()
+
+    Returns:
+        html.Table
+    """
+    header = html.Tr([
+        html.Th("Site"), html.Th("Year"), html.Th("Objective"),
+        html.Th("Value"), html.Th("Headroom"), html.Th("Status"),
+    ])
+
+    rows = []
+    for row in report.itertuples(index=False):
+        digits = 1 if row.objective == 'annual_mean' else 0
+        if row.value != row.value:
+            value = headroom = "--"
+        else:
+            value = f"{row.value:.{digits}f}"
+            headroom = f"{row.headroom:+.{digits}f}"
+
+        rows.append(html.Tr([
+            html.Td(row.site),
+            html.Td(f"{row.year} (partial)" if row.partial else str(row.year)),
+            html.Td(format_objective(row)),
+            html.Td(value),
+            html.Td(headroom),
+            html.Td(html.Span(
+                row.status.capitalize(),
+                className=f"compliance-status status-{row.status.replace(' ', '-')}")),
+        ]))
+
+    return html.Table(className="yoy-table", children=[html.Thead(header), html.Tbody(rows)])
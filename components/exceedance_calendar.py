@@ -0,0 +1,34 @@
+"""
+Exceedance Calendar Component
+Site × day heatmap showing where days near or over the limit cluster
+"""
+
+from dash import html, dcc
+
+
+def create_exceedance_calendar_section():
+    """
+    Creates the exceedance calendar card (figure filled by callback).
+    """
+    return html.Div(
+        className="card",
+        style={"marginTop": "24px"},
+        children=[
+            html.Div(
+                className="card-header",
+                children=[
+                    html.Div("Exceedance Calendar", className="card-title")
+                ]
+            ),
+            html.Div(
+                className="card-body",
+                children=[
+                    dcc.Graph(
+                        id="exceedance-calendar",
+                        figure={},
+                        config={'displayModeBar': False}
+                    )
+                ]
+            )
+        ]
+    )
@@ -0,0 +1,224 @@
+"""
+Figure Builders
+Time-series figures built straight from per-site arrays as WebGL traces,
+on one prebuilt dark template
+"""
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from utils.calculations import hex_to_rgba
+
+
+PALETTE = pio.templates["plotly_dark"].layout.colorway
+
+# Only the parts of plotly_dark these charts use, so each figure carries a
+# template of about a kilobyte instead of the full ten
+_dark = pio.templates["plotly_dark"].layout
+DARK_TEMPLATE = go.layout.Template(
+    layout=go.Layout(
+        autotypenumbers=_dark.autotypenumbers,
+        colorway=PALETTE,
+        font=_dark.font,
+        hoverlabel=_dark.hoverlabel,
+        hovermode=_dark.hovermode,
+        title=_dark.title,
+        xaxis=_dark.xaxis,
+        yaxis=_dark.yaxis,
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        margin=dict(t=60),
+    ),
+    data=dict(
+        scattergl=[go.Scattergl(
+            connectgaps=False,
+            hovertemplate="%{x|%d %b %Y %H:%M}<br>%{y:.1f} µg/m³",
+        )],
+    ),
+)
+del _dark
+
+CHART_HEIGHT = 400
+
+
+def message_figure(title, height=CHART_HEIGHT):
+    """Empty chart carrying only a title (prompts and 'no data' states)."""
+    return go.Figure(layout=go.Layout(template=DARK_TEMPLATE, title=title, height=height))
+
+
+# Built once; callbacks return these as they are
+SELECT_PROMPT_FIGURE = message_figure("Select sites, a pollutant, and a date range")
+NO_DATA_FIGURE = message_figure("No data for this selection")
+
+
+def site_colours(sites, taken=None):
+    """
+    A distinct colour per site.
+
+    Sites in taken keep the colour they have there (so traces already drawn
+    aren't recoloured); the rest get the first palette colours nobody is
+    using, in the order given. Past the palette's length, the least-used
+    colour is reused.
+
+    Args:
+        sites: Site names
+        taken: {site: colour} already assigned
+
+    Returns:
+        dict: {site: colour} for every site in sites
+    """
+    sites = [str(site) for site in sites]
+    colours = {site: colour for site, colour in (taken or {}).items() if site in sites}
+    uses = {colour: 0 for colour in PALETTE}
+    for colour in colours.values():
+        if colour in uses:
+            uses[colour] += 1
+    for site in sites:
+        if site not in colours:
+            colour = min(PALETTE, key=uses.__getitem__)
+            colours[site] = colour
+            uses[colour] += 1
+    return colours
+
+
+def _site_arrays(df, columns, unit="s"):
+    """
+    (site, {column: array}) per site, in order of first appearance.
+
+    Dates are cast to the coarsest unit the data needs: datetime64[ns]
+    serialises with nine trailing zeros, and daily buckets need no time.
+    """
+    arrays = {column: df[column].to_numpy() for column in columns}
+    arrays['date'] = df['date'].to_numpy(dtype=f"datetime64[{unit}]")
+    for site, positions in df.groupby('site', observed=True, sort=False).indices.items():
+        yield str(site), {column: values[positions] for column, values in arrays.items()}
+
+
+def time_series_figure(df, pollutant, colours, title=None, uirevision=None,
+                       template=DARK_TEMPLATE):
+    """
+    One WebGL line per site.
+
+    Every trace carries its site as legendgroup, in both builders, so a
+    caller can tell which traces belong to which site.
+
+    Args:
+        df: date, site and pollutant columns, each site's rows in date order
+            (as downsample_by_site() returns them)
+        pollutant: Column to plot
+        colours: {site: colour}, see site_colours()
+        title: Chart title
+        uirevision: Keeps zoom and legend state while unchanged
+        template: Layout template (a name or go.layout.Template)
+
+    Returns:
+        go.Figure
+    """
+    traces = [
+        go.Scattergl(
+            x=arrays['date'], y=arrays[pollutant], mode="lines", name=site,
+            legendgroup=site, line=dict(color=colours.get(site)),
+        )
+        for site, arrays in _site_arrays(df, ['date', pollutant])
+    ]
+    return _figure(traces, pollutant, title, uirevision, template)
+
+
+def band_figure(df, pollutant, colours, title=None, uirevision=None,
+                template=DARK_TEMPLATE):
+    """
+    Mean line over a shaded min-max band per site, toggled together.
+
+    Args:
+        df: date, site, mean, min and max columns (ResolutionPyramid.series)
+        Others: As time_series_figure()
+
+    Returns:
+        go.Figure
+    """
+    traces = []
+    for site, arrays in _site_arrays(df, ['date', 'mean', 'min', 'max'], unit="D"):
+        colour = colours.get(site)
+        band = dict(x=arrays['date'], mode="lines", line=dict(width=0),
+                    legendgroup=site, showlegend=False, hoverinfo="skip")
+        traces += [
+            go.Scattergl(y=arrays['max'], **band),
+            go.Scattergl(y=arrays['min'], fill="tonexty",
+                         fillcolor=hex_to_rgba(colour, 0.15), **band),
+            go.Scattergl(x=arrays['date'], y=arrays['mean'], mode="lines", name=site,
+                         legendgroup=site, line=dict(color=colour)),
+        ]
+    return _figure(traces, pollutant, title, uirevision, template)
+
+
+def _figure(traces, pollutant, title, uirevision, template):
+    return go.Figure(
+        data=traces,
+        layout=go.Layout(
+            template=template,
+            height=CHART_HEIGHT,
+            title=title,
+            xaxis_title="Date/Time",
+            yaxis_title=f"{pollutant} (µg/m³)",
+            legend_title="Site",
+            uirevision=uirevision,
+        ),
+    )
+
+
+# Green up to the limit, amber approaching it, red past it (ratio 1 = limit)
+EXCEEDANCE_COLORSCALE = [
+    [0.0, "#10B981"],
+    [0.4, "#10B981"],
+    [0.5, "#F59E0B"],
+    [0.5, "#EF4444"],
+    [1.0, "#7F1D1D"],
+]
+MAX_RATIO = 2
+
+
+def calendar_height(n_sites):
+    """Chart height giving each site's row about 22px."""
+    return max(220, 120 + 22 * n_sites)
+
+
+def exceedance_calendar_figure(sites, first_day, ratio, title):
+    """
+    Site × day heatmap of daily readings against a limit, as one trace.
+
+    The day axis is implied by x0 and a one-day dx, so the payload is the
+    site names and one rounded value per cell (null for days without
+    readings).
+
+    Args:
+        sites: Site names, one row each (top to bottom)
+        first_day: Date of the first column
+        ratio: (sites, days) reading / limit, as DailyCube.daily_ratio()
+        title: Chart title
+
+    Returns:
+        go.Figure
+    """
+    heatmap = go.Heatmap(
+        z=ratio.round(2),
+        x0=str(first_day),
+        dx=24 * 60 * 60 * 1000,
+        y=[str(site) for site in sites],
+        zmin=0,
+        zmax=MAX_RATIO,
+        colorscale=EXCEEDANCE_COLORSCALE,
+        colorbar=dict(title="× limit", thickness=12, tickvals=[0, 0.5, 1, 1.5, 2],
+                      ticktext=["0", "0.5", "1", "1.5", f"≥{MAX_RATIO}"]),
+        hovertemplate="%{y}<br>%{x|%a %d %b %Y}<br>%{z:.2f} × limit<extra></extra>",
+        hoverongaps=False,
+    )
+    return go.Figure(
+        data=[heatmap],
+        layout=go.Layout(
+            template=DARK_TEMPLATE,
+            height=calendar_height(len(sites)),
+            title=title,
+            xaxis=dict(type="date", showgrid=False),
+            yaxis=dict(autorange="reversed", showgrid=False),
+        ),
+    )
@@ -3,67 +3,180 @@ Station Cards Component
 Shows each station with circular gauge indicators (like Rooms in reference)
 """
 
+import math
+
 from dash import html, dcc
-import plotly.graph_objects as go
+
+from utils.calculations import POLLUTANT_DISPLAY_NAMES
+from utils.station_pages import SORT_ORDERS
+
+
+def format_gauge_value(value):
+    """Whole numbers as they are, anything else to one decimal; "--" if missing."""
+    value = float(value)
+    if not math.isfinite(value):
+        return "--"
+    return f"{value:.0f}" if value.is_integer() else f"{value:.1f}"
 
 
 def create_circular_gauge(value, max_val, color, size=60):
     """
-    Create a simple circular gauge using Plotly.
-    
+    Create a circular gauge as a CSS ring.
+
+    The ring is a conic gradient filled to value / max_val (capped at a
+    full turn) and masked to a band by .gauge-ring, with the value in the
+    middle. Plain divs, so a card grid mounts no Plotly figures. A missing
+    (NaN) value, such as the mean of a pollutant the site doesn't measure,
+    shows "--" over an empty ring.
+
     Args:
         value: Current value
         max_val: Maximum value for the gauge
         color: Color for the ring
         size: Size in pixels
-    
+
     Returns:
-        Plotly figure
+        html.Div
     """
     percentage = (value / max_val * 100) if max_val > 0 else 0
-    
-    fig = go.Figure(go.Indicator(
-        mode="gauge+number",
-        value=value,
-        number={'font': {'size': 14, 'color': '#FFFFFF'}},
-        gauge={
-            'axis': {'range': [0, max_val], 'visible': False},
-            'bar': {'color': color, 'thickness': 0.7},
-            'bgcolor': 'rgba(255,255,255,0.1)',
-            'borderwidth': 0,
-            'steps': [{'range': [0, max_val], 'color': 'rgba(255,255,255,0.05)'}],
-        }
-    ))
-    
-    fig.update_layout(
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font={'color': '#FFFFFF', 'family': 'Inter'},
-        height=size,
-        width=size,
-        margin=dict(l=0, r=0, t=0, b=0),
-        showlegend=False
+    if not math.isfinite(percentage):
+        percentage = 0
+    percentage = min(max(percentage, 0), 100)
+
+    return html.Div(
+        className="circular-gauge",
+        style={"width": f"{size}px", "height": f"{size}px"},
+        children=[
+            html.Div(
+                className="gauge-ring",
+                style={"background": f"conic-gradient({color} {percentage:.1f}%, "
+                                     f"rgba(255,255,255,0.1) 0)"}
+            ),
+            html.Div(format_gauge_value(value), className="gauge-value")
+        ]
     )
-    
-    return fig
 
 
 def create_station_cards_section():
     """
     Creates station cards grid (populated dynamically by callback).
-    Returns container div that will be filled by callback.
+    Returns the container the callback fills one page at a time, with the
+    pager below it.
+    """
+    return html.Div(
+        children=[
+            html.Div(
+                id="station-cards-container",
+                children=[
+                    html.Div(
+                        "Select stations and pollutant to view details",
+                        style={
+                            "textAlign": "center",
+                            "color": "var(--text-tertiary)",
+                            "padding": "40px",
+                            "fontSize": "15px"
+                        }
+                    )
+                ]
+            ),
+            html.Div(
+                className="station-pager",
+                children=[
+                    html.Button("‹ Prev", id="station-page-prev",
+                                className="pill-btn", n_clicks=0, disabled=True),
+                    html.Div(id="station-page-info", className="station-page-info"),
+                    html.Button("Next ›", id="station-page-next",
+                                className="pill-btn", n_clicks=0, disabled=True),
+                    dcc.Store(id="station-page-store", data=0),
+                    # The standard the grid is ranked by; None unless sorted
+                    # by exceedance
+                    dcc.Store(id="station-sort-standard", data=None)
+                ]
+            )
+        ]
+    )
+
+
+def create_station_sort_dropdown():
+    """Sort order for the station grid (card header)."""
+    return dcc.Dropdown(
+        id="station-sort",
+        options=[{"label": label, "value": value} for value, label in SORT_ORDERS.items()],
+        value="name",
+        clearable=False,
+        searchable=False,
+        className="station-sort"
+    )
+
+
+def create_station_card(result, pollutant):
     """
+    One station's card: an exceedance gauge per standard (CSS shows the
+    active one) and a completeness gauge.
+
+    Args:
+        result: SiteResult from the dashboard bundle
+        pollutant: Pollutant the exceedances are for
+    """
+    exceed_gauges = []
+    for standard, exceed_result in result.exceedance.items():
+        if exceed_result['type'] == 'count':
+            exceed_color = "#EF4444" if exceed_result['value'] > exceed_result['limit'] else "#10B981"
+        else:
+            exceed_color = "#F59E0B"
+
+        exceed_gauges.append(
+            html.Div(
+                className=f"standard-{standard.lower()}",
+                children=[
+                    create_circular_gauge(
+                        exceed_result['value'],
+                        exceed_result['limit'] if exceed_result['limit'] > 0 else 100,
+                        exceed_color,
+                        60
+                    ),
+                    html.Div(
+                        POLLUTANT_DISPLAY_NAMES.get(pollutant, pollutant),
+                        className="gauge-label"
+                    )
+                ]
+            )
+        )
+
+    completeness = result.completeness
+    comp_color = "#10B981" if completeness >= 85 else "#F59E0B" if completeness >= 75 else "#EF4444"
+
     return html.Div(
-        id="station-cards-container",
+        className="station-card",
         children=[
             html.Div(
-                "Select stations and pollutant to view details",
-                style={
-                    "textAlign": "center",
-                    "color": "var(--text-tertiary)",
-                    "padding": "40px",
-                    "fontSize": "15px"
-                }
+                className="station-info",
+                children=[
+                    html.Div(result.site, className="station-name"),
+                    html.Div(
+                        f"{result.observations} observations",
+                        className="station-meta"
+                    )
+                ]
+            ),
+            html.Div(
+                className="gauge-container",
+                children=exceed_gauges + [
+                    html.Div(
+                        children=[
+                            create_circular_gauge(completeness, 100, comp_color, 60),
+                            html.Div("Complete", className="gauge-label")
+                        ]
+                    )
+                ]
             )
         ]
     )
+
+
+def create_station_grid(results, pollutant):
+    """Cards for one page of SiteResults."""
+    return html.Div(
+        className="station-grid",
+        children=[create_station_card(result, pollutant) for result in results]
+    )
@@ -0,0 +1,100 @@
+"""
+Year Comparison Component
+Overlays the same months across several years, with per-site deltas
+"""
+
+from dash import html, dcc
+
+
+def create_year_comparison_section():
+    """
+    Creates the year-over-year card (chart and table filled by callbacks).
+    """
+    return html.Div(
+        className="card",
+        style={"marginTop": "24px"},
+        children=[
+            html.Div(
+                className="card-header",
+                children=[
+                    html.Div("Year-over-Year Comparison", className="card-title"),
+                    dcc.Dropdown(
+                        id="yoy-years",
+                        placeholder="Years to compare...",
+                        multi=True,
+                        value=None,
+                        className="yoy-years"
+                    )
+                ]
+            ),
+            html.Div(
+                className="card-body",
+                children=[
+                    dcc.Graph(
+                        id="yoy-chart",
+                        figure={},
+                        config={'displayModeBar': False}
+                    ),
+                    html.Div(id="yoy-table")
+                ]
+            )
+        ]
+    )
+
+
+def format_delta(value, digits=1):
+    """Signed change for the comparison table ('' for the first year)."""
+    if value is None or value != value:
+        return ""
+    if round(value, digits) == 0:
+        return "±0"
+    return f"{value:+.{digits}f}"
+
+
+def create_comparison_table(summary, standards):
+    """
+    Table of per-site, per-year means, exceedances and completeness.
+
+    Args:
+        summary: {standard: DataFrame} from CalendarAggregates.summarise
+        standards: Standards in display order; each gets its own exceedance
+            cell, and CSS shows the one the UK/WHO toggle selects
+
+    Returns:
+        html.Table
+    """
+    def value_with_delta(value, delta, digits=1, suffix=""):
+        if value != value:
+            return "--"
+        return [
+            f"{value:.{digits}f}{suffix}",
+            html.Span(format_delta(delta, digits), className="yoy-delta"),
+        ]
+
+    header = html.Tr([
+        html.Th("Site"), html.Th("Year"), html.Th("Mean (μg/m³)"),
+        html.Th("Exceedances"), html.Th("Completeness"),
+    ])
+
+    rows = []
+    first = summary[standards[0]]
+    for i, row in enumerate(first.itertuples(index=False)):
+        exceedances = [
+            html.Span(
+                value_with_delta(
+                    summary[standard]['exceedances'].iloc[i],
+                    summary[standard]['exceedances_delta'].iloc[i], 0),
+                className=f"standard-{standard.lower()}",
+            )
+            for standard in standards
+        ]
+
+        rows.append(html.Tr([
+            html.Td(row.site),
+            html.Td(str(row.year)),
+            html.Td(value_with_delta(row.mean, row.mean_delta)),
+            html.Td(exceedances),
+            html.Td(value_with_delta(row.completeness, row.completeness_delta, suffix="%")),
+        ]))
+
+    return html.Table(className="yoy-table", children=[html.Thead(header), html.Tbody(rows)])
@@ -0,0 +1,48 @@
+# gunicorn.conf.py
+"""
+Gunicorn settings for serving the dashboard in production.
+
+From the project root (next to the data file):
+
+    gunicorn
+    WEB_CONCURRENCY=8 BIND=0.0.0.0:8000 gunicorn
+
+preload_app builds the app and loads the data once in the master, and
+the workers share it: the data columns map one file (utils/shared_store.py)
+and the rest is copy-on-write (see src/wsgi.py). Each worker logs
+its memory once it has started and every LOG_EVERY requests after that.
+RSS includes the shared pages, so sum PSS to see the total.
+"""
+import os
+
+wsgi_app = "wsgi:server"
+pythonpath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+bind = os.environ.get("BIND", "0.0.0.0:8054")
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+# Dash fires several callbacks per interaction; threads let one worker
+# answer them concurrently
+worker_class = "gthread"
+threads = int(os.environ.get("THREADS", 4))
+preload_app = True
+timeout = 60
+
+LOG_EVERY = 500
+
+
+def when_ready(server):
+    import wsgi
+    server.log.info(wsgi.memory_report("Master"))
+
+
+def post_worker_init(worker):
+    import wsgi
+    worker.requests_served = 0
+    worker.log.info(wsgi.memory_report(f"Worker {worker.age}"))
+
+
+def post_request(worker, req, environ, resp):
+    worker.requests_served += 1
+    if worker.requests_served % LOG_EVERY == 0:
+        import wsgi
+        worker.log.info(wsgi.memory_report(
+            f"Worker {worker.age} after {worker.requests_served} requests"))
@@ -1,23 +1,33 @@
 # src/app.py
+import sys
+from pathlib import Path
+
 from dash import Dash
 
+# Shared helpers (utils/) live at the project root, one level above src/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
 from dataloader import load_data
 from layout import create_layout
 from callbacks import register_callbacks
 
 
-def create_app() -> Dash:
-    """Initialise the Dash app, load data, set layout, and register callbacks."""
+def create_app(shared: bool = False) -> Dash:
+    """Initialise the Dash app, load data, set layout, and register callbacks.
+
+    shared: load the data as views over the shared memory-mapped store
+    (see utils.shared_store) instead of a private copy.
+    """
     app = Dash(__name__)
 
-    # Load raw wide-format data and the reshaped long-format version
-    wales_df, wales_df_long = load_data()
+    # Load the per-site partitioned data store and the site/pollutant availability index
+    store, availability = load_data(shared)
 
-    # Build and assign the dashboard layout using the long-format data for dropdown options
-    app.layout = create_layout(wales_df_long)
+    # Build and assign the dashboard layout using the availability index for dropdown options
+    app.layout = create_layout(availability)
 
     # Wire up all interactivity — dropdowns, date picker, reset button, and graph
-    register_callbacks(app, wales_df, wales_df_long)
+    register_callbacks(app, store, availability)
 
     return app
 
@@ -2,49 +2,27 @@
 
 from dash import Input, Output, State, no_update, callback_context
 import pandas as pd
-import plotly.express as px
 
+from components.figures import (
+    NO_DATA_FIGURE,
+    SELECT_PROMPT_FIGURE,
+    site_colours,
+    time_series_figure,
+)
+from utils.downsample import downsample_by_site
 
-def register_callbacks(app, wales_df, wales_df_long):
-    # Precomputed maps to reduce repetition and increase dashboard's speed
-
-    site_to_pollutants = (
-        wales_df_long.groupby("site")["pollutants"]
-        .apply(set)
-        .to_dict()
-    )
-
-    site_to_dates = (
-        wales_df_long.groupby("site")["date"]
-        .agg(["min", "max"])
-        .apply(lambda r: (r["min"].date(), r["max"].date()), axis=1)
-        .to_dict()
-    )
-
-    pol_to_dates = (
-        wales_df_long.groupby("pollutants")["date"]
-        .agg(["min", "max"])
-        .apply(lambda r: (r["min"].date(), r["max"].date()), axis=1)
-        .to_dict()
-    )
 
-    site_pol_to_dates = (
-        wales_df_long.groupby(["site", "pollutants"])["date"]
-        .agg(["min", "max"])
-        .apply(lambda r: (r["min"].date(), r["max"].date()), axis=1)
-        .to_dict()
-    )
-
-    pol_to_sites = (
-        wales_df_long.groupby("pollutants")["site"]
-        .apply(set)
-        .to_dict()
-    )
-
-    all_sites = sorted(wales_df_long["site"].unique())
-    all_pollutants = sorted(wales_df_long["pollutants"].unique())
-    global_min = wales_df_long["date"].min().date()
-    global_max = wales_df_long["date"].max().date()
+def register_callbacks(app, store, availability):
+    # Precomputed maps to reduce repetition and increase dashboard's speed
+    site_to_pollutants = availability.site_to_pollutants
+    site_to_dates = availability.site_to_dates
+    pol_to_dates = availability.pol_to_dates
+    site_pol_to_dates = availability.site_pol_to_dates
+    pol_to_sites = availability.pol_to_sites
+    all_sites = availability.all_sites
+    all_pollutants = availability.all_pollutants
+    global_min = availability.global_min
+    global_max = availability.global_max
 
     def has_full_date_range(start_date, end_date):
         return bool(start_date) and bool(end_date)
@@ -344,30 +322,16 @@ def register_callbacks(app, wales_df, wales_df_long):
         selected_sites = selected_sites or []
 
         if not selected_sites or not pollutant or not has_full_date_range(start_date, end_date):
-            return px.line(title="Select sites, a pollutant, and a date range")
-
-        start_dt = pd.to_datetime(start_date)
-        end_dt = pd.to_datetime(end_date) + \
-            pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+            return SELECT_PROMPT_FIGURE
 
-        df = wales_df[
-            (wales_df["site"].isin(selected_sites)) &
-            (wales_df["date"] >= start_dt) &
-            (wales_df["date"] <= end_dt)
-        ].copy()
+        # Already grouped by site and sorted by date
+        df = store.select(selected_sites, start_date, end_date)
 
         if df.empty:
-            return px.line(title="No data for this selection")
-
-        df = df.sort_values(["site", "date"])
+            return NO_DATA_FIGURE
 
-        fig = px.line(df, x="date", y=pollutant, color="site")
-        fig.update_traces(connectgaps=False)
+        # At most MAX_POINTS_PER_TRACE points per site, peaks and gaps kept
+        df = downsample_by_site(df, pollutant)
 
-        fig.update_layout(
-            xaxis_title="Date/Time",
-            yaxis_title=f"{pollutant} (µg/m³)",
-            legend_title="Site",
-            margin=dict(t=60),
-        )
-        return fig
+        colours = site_colours(s for s in store.sites if s in selected_sites)
+        return time_series_figure(df, pollutant, colours, template="plotly")
@@ -1,26 +1,20 @@
-import pandas as pd
+from utils.data_cache import load_wales_data
+from utils.availability import build_availability_index
+from utils.site_store import SiteStore
 
 
-def load_data():
-    # Load the raw air quality data from CSV
-    wales_df = pd.read_csv("wales_air_quality_data_16.csv")
+def load_data(shared=False):
+    # Load the air quality data — parsed once from CSV, then served from the
+    # columnar .npy cache until the CSV changes. With shared=True the columns
+    # are views over one memory-mapped file that every worker maps
+    wales_df = load_wales_data("wales_air_quality_data_16.csv", shared=shared)
 
-    # Parse the date column, coercing any unparseable values to NaT
-    wales_df["date"] = pd.to_datetime(wales_df["date"], errors="coerce")
+    # Precompute which sites measure which pollutants and over which dates,
+    # straight from the wide frame (no melt to long format)
+    availability = build_availability_index(wales_df)
 
-    # Pollutant columns to unpivot from wide to long format
-    pollutant_cols = ["NO2", "PM2.5", "PM10", "O3", "SO2"]
+    # Keep each site's rows contiguous and date-sorted so the graph can
+    # slice a date range with a binary search instead of masking every row
+    store = SiteStore(wales_df)
 
-    # Reshape from wide (one column per pollutant) to long format
-    # (one row per site-date-pollutant combination) for easier filtering
-    wales_df_long = wales_df.copy().melt(
-        id_vars=["date", "site", "site_id", "code"],
-        value_vars=pollutant_cols,
-        var_name="pollutants",
-        value_name="value"
-    )
-
-    # Drop rows where the pollutant has no recorded measurement
-    wales_df_long = wales_df_long.dropna(subset=["value"])
-
-    return wales_df, wales_df_long
+    return store, availability
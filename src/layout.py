@@ -1,8 +1,9 @@
 from dash import html, dcc
 
 
-def create_layout(wales_df_long):
-    return [
+def create_layout(availability):
+    # Dash needs a single root component, not a list
+    return html.Div([
         # Dashboard title
         html.Div(children="TEAM 16 UK-AIR DASHBOARD"),
 
@@ -12,7 +13,7 @@ def create_layout(wales_df_long):
         # Multi-select dropdown for monitoring sites —
         # options are dynamically filtered by the selected pollutant and date range
         dcc.Dropdown(
-            options=wales_df_long['site'].unique(),
+            options=availability.all_sites,
             value=None,
             multi=True,
             id="site_drop",
@@ -22,7 +23,7 @@ def create_layout(wales_df_long):
         # Single-select dropdown for pollutant —
         # options are dynamically filtered to only those measured by all selected sites
         dcc.Dropdown(
-            options=wales_df_long["pollutants"].unique(),
+            options=availability.all_pollutants,
             value=None,
             id='pol_drop',
             placeholder="Choose pollutant..."
@@ -48,4 +49,4 @@ def create_layout(wales_df_long):
 
         # Main time series chart — updates when any filter changes
         dcc.Graph(figure={}, id="controls-and-graph")
-    ]
+    ])
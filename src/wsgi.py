@@ -0,0 +1,33 @@
+# src/wsgi.py
+"""
+Production entry point: the create_app() dashboard as a WSGI callable.
+
+Run under a multi-process server with the app preloaded, e.g. gunicorn
+with the gunicorn.conf.py at the project root:
+
+    gunicorn
+
+Importing this module loads the data and builds the app, so with
+preload_app the master does it once before forking. The workers then
+share its memory pages instead of each loading their own copy.
+"""
+import gc
+import sys
+from pathlib import Path
+
+# The src/ app module, not the dashboard at the project root
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from app import create_app
+from utils.process_memory import memory_report  # noqa: F401 (gunicorn.conf.py hooks)
+
+# Data columns are views over one memory-mapped file (see
+# utils.shared_store), so even pages the workers touch stay shared
+app = create_app(shared=True)
+server = app.server
+
+# Move everything built so far out of the collector's reach: a collection
+# in a worker would otherwise write to every object header and un-share
+# the pages they sit on
+gc.freeze()
+
@@ -0,0 +1,89 @@
+"""
+Availability Index
+Which sites measure which pollutants, and over which dates - built straight
+from the wide frame without melting it
+"""
+
+from utils.data_cache import POLLUTANT_COLUMNS
+
+
+class AvailabilityIndex:
+    """
+    Precomputed lookup maps used by the filter callbacks.
+
+    Attributes:
+        site_to_pollutants: {site: set of pollutants with any reading}
+        site_to_dates: {site: (first date, last date)} over all pollutants
+        pol_to_dates: {pollutant: (first date, last date)} over all sites
+        site_pol_to_dates: {(site, pollutant): (first date, last date)}
+        pol_to_sites: {pollutant: set of sites measuring it}
+        all_sites: sorted list of sites with any reading
+        all_pollutants: sorted list of pollutants with any reading
+        global_min, global_max: date bounds over the whole dataset
+    """
+
+    def __init__(self, site_pol_to_dates):
+        self.site_pol_to_dates = site_pol_to_dates
+
+        self.site_to_pollutants = {}
+        self.pol_to_sites = {}
+        site_ranges = {}
+        pol_ranges = {}
+
+        for (site, pol), (first, last) in site_pol_to_dates.items():
+            self.site_to_pollutants.setdefault(site, set()).add(pol)
+            self.pol_to_sites.setdefault(pol, set()).add(site)
+            site_ranges.setdefault(site, []).append((first, last))
+            pol_ranges.setdefault(pol, []).append((first, last))
+
+        self.site_to_dates = {k: _span(v) for k, v in site_ranges.items()}
+        self.pol_to_dates = {k: _span(v) for k, v in pol_ranges.items()}
+
+        self.all_sites = sorted(self.site_to_pollutants)
+        self.all_pollutants = sorted(self.pol_to_sites)
+
+        if site_pol_to_dates:
+            self.global_min, self.global_max = _span(site_pol_to_dates.values())
+        else:
+            self.global_min = self.global_max = None
+
+
+def _span(ranges):
+    ranges = list(ranges)
+    return min(r[0] for r in ranges), max(r[1] for r in ranges)
+
+
+def build_availability_index(wales_df, pollutants=POLLUTANT_COLUMNS):
+    """
+    Build the availability maps with one notna reduction per pollutant column.
+
+    Each pollutant's valid rows are grouped by site for their first and last
+    timestamp, so nothing larger than one date column is ever materialised
+    (a melted long frame is ~5x the wide frame's row count).
+
+    Args:
+        wales_df: Wide-format data with 'date' and 'site' columns
+        pollutants: Pollutant columns to index
+
+    Returns:
+        AvailabilityIndex
+    """
+    site_pol_to_dates = {}
+
+    for pol in pollutants:
+        if pol not in wales_df.columns:
+            continue
+
+        valid = wales_df[pol].notna() & wales_df["date"].notna()
+        if not valid.any():
+            continue
+
+        bounds = (
+            wales_df.loc[valid, "date"]
+            .groupby(wales_df.loc[valid, "site"], observed=True)
+            .agg(["min", "max"])
+        )
+        for site, row in bounds.iterrows():
+            site_pol_to_dates[(site, pol)] = (row["min"].date(), row["max"].date())
+
+    return AvailabilityIndex(site_pol_to_dates)
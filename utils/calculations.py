@@ -1,6 +1,6 @@
 """
 Integrated Utility Functions
-Combines Rosie's exceedance logic + Charles' completeness calculations
+Limits and Rosie's exceedance rules, summary statistics and display helpers
 """
 
 import pandas as pd
@@ -24,6 +24,9 @@ LIMITS = {
     }
 }
 
+# Every standard the dashboard can switch between
+STANDARDS = tuple(LIMITS)
+
 POLLUTANT_DISPLAY_NAMES = {
     'NO2': 'NO₂',
     'PM2.5': 'PM₂.₅',
@@ -32,14 +35,43 @@ POLLUTANT_DISPLAY_NAMES = {
     'SO2': 'SO₂'
 }
 
-def calculate_exceedance_rosie(df, pollutant, threshold_type='UK'):
+# How each pollutant/standard pair is assessed, as (metric, limit, allowed):
+#   'mean'        - mean of all hourly readings (no exceedance count)
+#   'hourly'      - hours above the limit
+#   'daily_mean'  - days whose mean is above the limit
+#   'daily_max'   - days whose highest hour is above the limit
+#   '8h'          - days whose highest 8-hour rolling mean is above the limit
+# 'allowed' is the UK annual exceedance allowance shown next to the count
+# (None where the tile compares the count against the limit instead).
+EXCEEDANCE_RULES = {
+    ('PM2.5', 'UK'): ('mean', LIMITS['UK']['PM2.5']['annual'], None),
+    ('PM2.5', 'WHO'): ('daily_mean', LIMITS['WHO']['PM2.5']['daily'], None),
+    ('PM10', 'UK'): ('daily_mean', LIMITS['UK']['PM10']['daily'],
+                     LIMITS['UK']['PM10']['annual_allowed']),
+    ('PM10', 'WHO'): ('daily_mean', LIMITS['WHO']['PM10']['daily'],
+                      LIMITS['UK']['PM10']['annual_allowed']),
+    ('NO2', 'UK'): ('hourly', LIMITS['UK']['NO2']['hourly'],
+                    LIMITS['UK']['NO2']['annual_allowed']),
+    ('NO2', 'WHO'): ('daily_max', LIMITS['WHO']['NO2']['daily'], None),
+    ('SO2', 'UK'): ('daily_mean', LIMITS['UK']['SO2']['daily'],
+                    LIMITS['UK']['SO2']['annual_allowed']),
+    ('SO2', 'WHO'): ('daily_mean', LIMITS['WHO']['SO2']['daily'],
+                     LIMITS['UK']['SO2']['annual_allowed']),
+    ('O3', 'UK'): ('8h', LIMITS['UK']['O3']['8h'],
+                   LIMITS['UK']['O3']['annual_allowed']),
+    ('O3', 'WHO'): ('8h', LIMITS['WHO']['O3']['8h'],
+                    LIMITS['UK']['O3']['annual_allowed']),
+}
+
+
+def format_exceedance(pollutant, threshold_type, value):
     """
-    Calculate exceedances using Rosie's sophisticated logic.
+    Wrap a computed exceedance value in the dict the dashboard displays.
     
     Args:
-        df: Filtered DataFrame (wide format)
         pollutant: Pollutant name (e.g., 'NO2', 'PM2.5')
         threshold_type: 'UK' or 'WHO'
+        value: Exceedance count, or the mean for 'mean' rules
     
     Returns:
         dict: {
@@ -49,213 +81,126 @@ def calculate_exceedance_rosie(df, pollutant, threshold_type='UK'):
             'type': 'count' or 'mean'
         }
     """
-    if df.empty or pollutant not in df.columns:
+    rule = EXCEEDANCE_RULES.get((pollutant, threshold_type))
+    if rule is None:
         return {
             'value': 0,
             'limit': 0,
-            'label': 'No data available',
+            'label': 'Unknown pollutant',
             'type': 'none'
         }
     
-    # PM2.5: Annual mean (UK) or daily exceedances (WHO)
-    if pollutant == 'PM2.5':
-        if threshold_type == 'WHO':
-            daily_mean = df.groupby(df['date'].dt.date)[pollutant].mean()
-            value = (daily_mean > LIMITS['WHO']['PM2.5']['daily']).sum()
-            return {
-                'value': int(value),
-                'limit': LIMITS['WHO']['PM2.5']['daily'],
-                'label': f'Days exceeding {LIMITS["WHO"]["PM2.5"]["daily"]} μg/m³',
-                'type': 'count'
-            }
-        else:
-            value = df[pollutant].mean()
-            limit = LIMITS['UK']['PM2.5']['annual']
-            return {
-                'value': round(value, 1),
-                'limit': limit,
-                'label': f'Annual mean (limit: {limit} μg/m³)',
-                'type': 'mean'
-            }
+    metric, limit, annual_allowed = rule
     
-    # PM10: Daily exceedances
-    elif pollutant == 'PM10':
-        daily_mean = df.groupby(df['date'].dt.date)[pollutant].mean()
-        limit = LIMITS[threshold_type]['PM10']['daily']
-        value = (daily_mean > limit).sum()
-        annual_allowed = LIMITS['UK']['PM10']['annual_allowed']
+    # PM2.5 (UK): annual mean against the limit
+    if metric == 'mean':
         return {
-            'value': int(value),
-            'limit': annual_allowed,
-            'label': f'Days exceeding {limit} μg/m³ (max {annual_allowed}/year)',
-            'type': 'count'
+            'value': round(float(value), 1),
+            'limit': limit,
+            'label': f'Annual mean (limit: {limit} μg/m³)',
+            'type': 'mean'
         }
     
-    # NO2: Hourly exceedances (UK) or daily exceedances (WHO)
-    elif pollutant == 'NO2':
-        if threshold_type == 'WHO':
-            daily_max = df.groupby(df['date'].dt.date)[pollutant].max()
-            value = (daily_max > LIMITS['WHO']['NO2']['daily']).sum()
-            return {
-                'value': int(value),
-                'limit': LIMITS['WHO']['NO2']['daily'],
-                'label': f'Days exceeding {LIMITS["WHO"]["NO2"]["daily"]} μg/m³',
-                'type': 'count'
-            }
-        else:
-            value = (df[pollutant] > LIMITS['UK']['NO2']['hourly']).sum()
-            annual_allowed = LIMITS['UK']['NO2']['annual_allowed']
-            return {
-                'value': int(value),
-                'limit': annual_allowed,
-                'label': f'Hours exceeding {LIMITS["UK"]["NO2"]["hourly"]} μg/m³ (max {annual_allowed}/year)',
-                'type': 'count'
-            }
-    
-    # SO2: Daily exceedances
-    elif pollutant == 'SO2':
-        daily_mean = df.groupby(df['date'].dt.date)[pollutant].mean()
-        limit = LIMITS[threshold_type]['SO2']['daily']
-        value = (daily_mean > limit).sum()
-        annual_allowed = LIMITS['UK']['SO2']['annual_allowed']
+    # No allowance: the count is compared against the limit itself
+    if annual_allowed is None:
         return {
             'value': int(value),
-            'limit': annual_allowed,
-            'label': f'Days exceeding {limit} μg/m³ (max {annual_allowed}/year)',
+            'limit': limit,
+            'label': f'Days exceeding {limit} μg/m³',
             'type': 'count'
         }
     
-    # O3: 8-hour rolling mean exceedances
-    elif pollutant == 'O3':
-        df_sorted = df.sort_values('date')
-        df_sorted['8h_mean'] = df_sorted[pollutant].rolling(window=8, min_periods=8).mean()
-        daily_max = df_sorted.groupby(df_sorted['date'].dt.date)['8h_mean'].max()
-        limit = LIMITS[threshold_type]['O3']['8h']
-        value = (daily_max > limit).sum()
-        annual_allowed = LIMITS['UK']['O3']['annual_allowed']
-        return {
-            'value': int(value),
-            'limit': annual_allowed,
-            'label': f'Days exceeding 8h mean {limit} μg/m³ (max {annual_allowed}/year)',
-            'type': 'count'
-        }
+    if metric == 'hourly':
+        label = f'Hours exceeding {limit} μg/m³ (max {annual_allowed}/year)'
+    elif metric == '8h':
+        label = f'Days exceeding 8h mean {limit} μg/m³ (max {annual_allowed}/year)'
+    else:
+        label = f'Days exceeding {limit} μg/m³ (max {annual_allowed}/year)'
     
     return {
-        'value': 0,
-        'limit': 0,
-        'label': 'Unknown pollutant',
-        'type': 'none'
+        'value': int(value),
+        'limit': annual_allowed,
+        'label': label,
+        'type': 'count'
     }
 
 
-
-
-def calculate_completeness(df, pollutant, date_col='date'):
-    """
-    Calculate data completeness percentage.
-    
-    Args:
-        df: DataFrame with date and pollutant data
-        pollutant: Pollutant column name
-        date_col: Name of date column
-    
-    Returns:
-        float: Percentage completeness (0-100)
-    """
-    if df.empty or pollutant not in df.columns or date_col not in df.columns:
-        return 0.0
-    
-    expected = df[date_col].nunique()
-    if expected == 0:
-        return 0.0
-    
-    actual = df[pollutant].notna().sum()
-    completeness = (actual / len(df)) * 100
-    
-    return round(completeness, 1)
-
-
-def calculate_completeness_by_site(df, sites, pollutant):
+def completeness_status(completeness):
     """
-    Calculate completeness for each site.
+    Classify a completeness percentage for the completeness bars.
     
     Args:
-        df: DataFrame with site and pollutant data
-        sites: List of site names
-        pollutant: Pollutant column name
+        completeness: Percentage (0-100)
     
     Returns:
-        list: [{site, completeness, status}]
+        str: 'high' (>= 85%), 'mid' (>= 75%) or 'low'
     """
-    if df.empty or 'site' not in df.columns or pollutant not in df.columns:
-        return []
-    
-    results = []
-    
-    for site in sites:
-        site_df = df[df['site'] == site]
-        if not site_df.empty:
-            expected = len(site_df)
-            valid = site_df[pollutant].notna().sum()
-            completeness = round((valid / expected) * 100, 1) if expected > 0 else 0.0
-            
-            # Status classification
-            if completeness >= 85:
-                status = 'high'
-            elif completeness >= 75:
-                status = 'mid'
-            else:
-                status = 'low'
-            
-            results.append({
-                'site': site,
-                'completeness': completeness,
-                'status': status
-            })
-    
-    return results
+    if completeness >= 85:
+        return 'high'
+    elif completeness >= 75:
+        return 'mid'
+    return 'low'
 
 
-def calculate_summary_stats(df, pollutant):
+def calculate_summary_stats(df, pollutant, moments=None, sketch=None):
     """
     Calculate summary statistics for a pollutant.
     
     Args:
-        df: DataFrame with pollutant data
+        df: DataFrame with pollutant data (None when sketch is given)
         pollutant: Pollutant column name
+        moments: Optional precomputed {'mean', 'std'} for the same rows
+            (e.g. from PrefixSums.moments), used instead of rescanning
+        sketch: Optional QuantileSketches.summary() for the same rows; median,
+            IQR, min and max then come from it and df is not scanned
     
     Returns:
         dict: {mean, median, std, min, max, iqr}
     """
-    if df.empty or pollutant not in df.columns:
+    empty = {
+        'mean': '--',
+        'median': '--',
+        'std': '--',
+        'min': '--',
+        'max': '--',
+        'iqr': '--'
+    }
+
+    if sketch is not None and moments is not None:
+        if sketch['count'] == 0:
+            return empty
+        quantiles = sketch['quantiles']
         return {
-            'mean': '--',
-            'median': '--',
-            'std': '--',
-            'min': '--',
-            'max': '--',
-            'iqr': '--'
+            'mean': round(moments['mean'], 1),
+            'median': round(quantiles[0.5], 1),
+            'std': round(moments['std'] if moments['std'] is not None else np.nan, 1),
+            'min': round(float(sketch['min']), 1),
+            'max': round(float(sketch['max']), 1),
+            'iqr': round(quantiles[0.75] - quantiles[0.25], 1)
         }
+
+    if df.empty or pollutant not in df.columns:
+        return empty
     
     data = df[pollutant].dropna()
     
     if len(data) == 0:
-        return {
-            'mean': '--',
-            'median': '--',
-            'std': '--',
-            'min': '--',
-            'max': '--',
-            'iqr': '--'
-        }
+        return empty
     
     q1 = data.quantile(0.25)
     q3 = data.quantile(0.75)
     
+    if moments is not None:
+        mean = moments['mean']
+        std = moments['std'] if moments['std'] is not None else np.nan
+    else:
+        mean = data.mean()
+        std = data.std()
+    
     return {
-        'mean': round(data.mean(), 1),
+        'mean': round(mean, 1),
         'median': round(data.median(), 1),
-        'std': round(data.std(), 1),
+        'std': round(std, 1),
         'min': round(data.min(), 1),
         'max': round(data.max(), 1),
         'iqr': round(q3 - q1, 1)
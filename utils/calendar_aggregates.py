@@ -0,0 +1,225 @@
+"""
+Calendar Aggregates
+Monthly and yearly per-site totals rolled up from the daily cube, for
+year-over-year comparisons of the same months
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.calculations import EXCEEDANCE_RULES
+
+
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+SUMMARY_COLUMNS = ['site', 'year', 'mean', 'exceedances', 'completeness',
+                   'mean_delta', 'exceedances_delta', 'completeness_delta']
+
+
+class CalendarAggregates:
+    """
+    (site, year, month, pollutant) totals over whole calendar years.
+
+    The month axis runs from January of the first year to December of the
+    last, so every array reshapes to (sites, years, 12): comparing the same
+    months across years is an index on the last two axes, and yearly totals
+    are a sum over the month axis, kept precomputed.
+
+    Attributes:
+        sites, pollutants: As in the daily cube
+        years: Calendar years (axis 1)
+        hours: (years, 12) calendar hours in each month
+        count: (sites, years, 12, pollutants) valid hours
+        total: sum of valid readings (float64)
+        exceedances: {(pollutant, standard): (sites, years, 12)} exceedance
+            counts for count-based rules
+        yearly_count, yearly_total, yearly_exceedances: The same summed
+            over months
+    """
+
+    def __init__(self, cube):
+        self.sites = list(cube.sites)
+        self.pollutants = list(cube.pollutants)
+        self._site_index = {site: i for i, site in enumerate(self.sites)}
+
+        first = cube.days[0].astype("datetime64[Y]")
+        last = cube.days[-1].astype("datetime64[Y]")
+        self.years = np.arange(first, last + 1).astype(np.int64) + 1970
+        n_sites, n_years = len(self.sites), len(self.years)
+
+        month_starts = np.arange(
+            first.astype("datetime64[M]"), (last + 1).astype("datetime64[M]") + 1)
+        days_in_month = np.diff(month_starts.astype("datetime64[D]")).astype(np.int64)
+        self.hours = (days_in_month * 24).reshape(n_years, 12)
+
+        # Offsets of each month in the cube's day axis (clipped to its span)
+        edges = np.searchsorted(cube.days, month_starts.astype("datetime64[D]"))
+
+        def monthly(daily):
+            """Sum a (sites, days, ...) array into (sites, years, 12, ...)."""
+            padded = np.concatenate(
+                [daily, np.zeros_like(daily[:, :1])], axis=1)
+            sums = np.add.reduceat(padded, edges[:-1], axis=1)
+            # reduceat returns the value at the start for empty months
+            sums[:, edges[:-1] == edges[1:]] = 0
+            return sums.reshape((n_sites, n_years, 12) + daily.shape[2:])
+
+        count = cube.count.astype(np.int64)
+        self.count = monthly(count)
+        self.total = monthly(np.nan_to_num(cube.mean.astype(np.float64)) * count)
+
+        self.exceedances = {}
+        for (pollutant, standard), (metric, limit, _) in EXCEEDANCE_RULES.items():
+            if metric == 'mean' or pollutant not in self.pollutants:
+                continue
+            k = self.pollutants.index(pollutant)
+            self.exceedances[(pollutant, standard)] = monthly(
+                cube.daily_exceedances(metric, limit, k).astype(np.int64))
+
+        self.yearly_count = self.count.sum(axis=2)
+        self.yearly_total = self.total.sum(axis=2)
+        self.yearly_exceedances = {
+            key: counts.sum(axis=2) for key, counts in self.exceedances.items()
+        }
+
+    def _select(self, sites, pollutant, years, months):
+        """
+        Sites, seasons and months of a comparison, or None if empty.
+
+        A window whose months wrap the year end (e.g. Nov-Feb) is a season
+        that starts in the listed year: months after the wrap come from the
+        following year. Returns (names, year_list, index, month_index,
+        take, hours): take(values) gathers a (sites, years, 12) array into
+        (sites, seasons, months), with zeros past the last year, and hours
+        holds the calendar hours of each (season, month).
+        """
+        names = [s for s in sites or [] if s in self._site_index]
+        year_list = [y for y in years or [] if y in set(self.years.tolist())]
+        if not names or not year_list or pollutant not in self.pollutants:
+            return None
+        index = np.array([self._site_index[s] for s in names])
+        month_index = np.arange(12) if not months else np.array(months) - 1
+
+        # Each wrap back to an earlier month moves on a year
+        offset = np.concatenate([[0], np.cumsum(np.diff(month_index) < 0)])
+        position = np.searchsorted(self.years, year_list)[:, None] + offset
+        inside = position < len(self.years)
+        position = np.minimum(position, len(self.years) - 1)
+
+        def take(values):
+            return values[index][:, position, month_index] * inside
+
+        # Calendar hours, including months past the last year
+        month_start = ((np.array(year_list)[:, None] + offset - 1970) * 12
+                       + month_index).astype("datetime64[M]")
+        hours = ((month_start + 1).astype("datetime64[D]")
+                 - month_start.astype("datetime64[D]")).astype(np.int64) * 24
+        return names, year_list, index, month_index, take, hours
+
+    def compare(self, sites, pollutant, years, months=None):
+        """
+        Year-over-year monthly means of the same months.
+
+        A window that wraps the year end is a season starting in each
+        listed year, so Nov-Feb for 2021 is Nov 2021 to Feb 2022.
+
+        Args:
+            sites: Site names
+            pollutant: Pollutant column
+            years: Years to compare, in display order
+            months: Month numbers 1-12 to include, in display order
+                (default: whole years)
+
+        Returns:
+            DataFrame: site, year, month, mean, completeness
+        """
+        selection = self._select(sites, pollutant, years, months)
+        if selection is None:
+            return pd.DataFrame()
+        names, year_list, index, month_index, take, hours = selection
+        k = self.pollutants.index(pollutant)
+
+        count = take(self.count[..., k])
+        total = take(self.total[..., k])
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, total / count, np.nan)
+            complete = np.minimum(count / hours * 100, 100)
+
+        n_sites, n_years, n_months = count.shape
+        return pd.DataFrame({
+            'site': np.repeat(names, n_years * n_months),
+            'year': np.tile(np.repeat(year_list, n_months), n_sites),
+            'month': np.tile(month_index + 1, n_sites * n_years),
+            'mean': mean.ravel(),
+            'completeness': complete.ravel(),
+        })
+
+    def summarise(self, sites, pollutant, years, months=None, standards=('UK',)):
+        """
+        Per-(site, year) totals over the compared months, per standard.
+
+        The mean and completeness are computed once and shared; only the
+        exceedance counts differ between standards.
+
+        Args:
+            sites, pollutant, years, months: As for compare, including
+                seasons that wrap the year end (whole years are served
+                from the yearly totals)
+            standards: Standards whose exceedance rule to count (exceedances
+                are NaN for annual-mean rules, whose measure is the mean,
+                and for periods without readings)
+
+        Returns:
+            dict: {standard: DataFrame with one row per (site, year) of
+            mean, exceedances, completeness and mean_delta,
+            exceedances_delta and completeness_delta against the previous
+            year listed}; empty DataFrames when nothing matches
+        """
+        selection = self._select(sites, pollutant, years, months)
+        if selection is None:
+            return {standard: pd.DataFrame() for standard in standards}
+        names, year_list, index, month_index, take, hours = selection
+        k = self.pollutants.index(pollutant)
+
+        if months:
+            count = take(self.count[..., k]).sum(axis=2)
+            total = take(self.total[..., k]).sum(axis=2)
+        else:
+            # Whole years come straight from the yearly totals
+            grid = np.ix_(index, np.searchsorted(self.years, year_list))
+            count = self.yearly_count[..., k][grid]
+            total = self.yearly_total[..., k][grid]
+        hours = hours.sum(axis=1)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, total / count, np.nan)
+            complete = np.minimum(count / hours * 100, 100)
+
+        n_sites, n_years = count.shape
+        base = pd.DataFrame({
+            'site': np.repeat(names, n_years),
+            'year': np.tile(year_list, n_sites),
+            'mean': mean.ravel(),
+            'completeness': complete.ravel(),
+        })
+        by_site = base.groupby('site', sort=False)
+        for column in ('mean', 'completeness'):
+            base[f'{column}_delta'] = by_site[column].diff()
+
+        summaries = {}
+        for standard in standards:
+            key = (pollutant, standard)
+            if key not in self.exceedances:
+                exceed = np.full(count.shape, np.nan)
+            elif months:
+                exceed = take(self.exceedances[key]).sum(axis=2)
+            else:
+                exceed = self.yearly_exceedances[key][grid]
+            summary = base.copy()
+            summary['exceedances'] = np.where(count > 0, exceed, np.nan).ravel()
+            summary['exceedances_delta'] = summary.groupby(
+                'site', sort=False)['exceedances'].diff()
+            summaries[standard] = summary[SUMMARY_COLUMNS]
+        return summaries
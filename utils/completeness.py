@@ -0,0 +1,119 @@
+"""
+Completeness
+Per-site, per-pollutant hourly validity bitmaps over the full calendar, so
+completeness counts missing hours whether or not they have a row
+"""
+
+import numpy as np
+
+from utils.data_cache import POLLUTANT_COLUMNS
+from utils.site_store import date_bounds
+
+
+HOUR = np.timedelta64(1, "h")
+
+# Set bits in each byte value, for popcounts over packed bitmaps
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class HourlyValidity:
+    """
+    One bit per (site, clock hour) for each pollutant: set when that hour
+    has a valid reading.
+
+    The calendar runs from the first to the last hour in the data, so a
+    range's expected hours are simply its length in hours and its valid
+    hours a popcount over the packed bits - duplicate rows count once and
+    hours with no row at all count as missing.
+
+    Attributes:
+        sites: Site names (bitmap rows), in store order
+        pollutants: Pollutants with bitmaps
+        first: datetime64[h] of bit 0
+        n_hours: Calendar length in hours
+        bits: {pollutant: (sites, bytes) uint8, little-endian bit order}
+    """
+
+    def __init__(self, store, pollutants=POLLUTANT_COLUMNS):
+        self.sites = list(store.sites)
+        self.pollutants = [p for p in pollutants if p in store.frame.columns]
+        self._site_index = {site: i for i, site in enumerate(self.sites)}
+
+        hours = store.dates.astype("datetime64[h]")
+        if len(hours):
+            self.first = hours.min()
+            self.n_hours = int((hours.max() - self.first) // HOUR) + 1
+        else:
+            self.first = np.datetime64("1970-01-01T00", "h")
+            self.n_hours = 0
+
+        # Pad each site's row of bits to whole bytes
+        width = -(-self.n_hours // 8) * 8
+        site_of_row = np.repeat(
+            np.arange(len(self.sites)),
+            [hi - lo for lo, hi in store.bounds.values()],
+        )
+        position = site_of_row * width + (hours - self.first) // HOUR
+
+        self.bits = {}
+        for pollutant in self.pollutants:
+            valid = store.frame[pollutant].notna().to_numpy()
+            flags = np.zeros(len(self.sites) * width, dtype=bool)
+            flags[position[valid]] = True
+            self.bits[pollutant] = np.packbits(
+                flags.reshape(len(self.sites), width), axis=1, bitorder="little")
+
+    def hour_range(self, start_date, end_date):
+        """Calendar bit range [lo, hi) for a date range (end day inclusive)."""
+        start, end = date_bounds(start_date, end_date)
+        lo = (start.to_datetime64().astype("datetime64[h]") - self.first) // HOUR
+        hi = (end.to_datetime64().astype("datetime64[h]") - self.first) // HOUR
+        lo = int(np.clip(lo, 0, self.n_hours))
+        hi = int(np.clip(hi, lo, self.n_hours))
+        return lo, hi
+
+    def valid_hours(self, sites, start_date, end_date, pollutant):
+        """
+        Valid and expected hours per site, one popcount over all sites.
+
+        Returns:
+            tuple: (site names known to the store, valid hours per site,
+            expected hours per site)
+        """
+        names = [s for s in sites or [] if s in self._site_index]
+        lo, hi = self.hour_range(start_date, end_date)
+        if not names or hi <= lo or pollutant not in self.bits:
+            return names, np.zeros(len(names), dtype=np.int64), 0
+
+        index = np.array([self._site_index[s] for s in names], dtype=np.intp)
+        first_byte, last_byte = lo // 8, (hi - 1) // 8
+        block = self.bits[pollutant][index, first_byte:last_byte + 1].copy()
+
+        # Drop the bits outside [lo, hi) in the end bytes
+        block[:, 0] &= np.uint8((0xFF << (lo % 8)) & 0xFF)
+        block[:, -1] &= np.uint8(0xFF >> (7 - (hi - 1) % 8))
+
+        valid = POPCOUNT[block].sum(axis=1, dtype=np.int64)
+        return names, valid, hi - lo
+
+    def completeness(self, sites, start_date, end_date, pollutant):
+        """
+        Overall and per-site completeness for a selection.
+
+        Returns:
+            dict: {'overall': percentage, 'sites': {site: percentage},
+            'valid': total valid hours, 'expected': total expected hours}
+        """
+        names, valid, expected = self.valid_hours(sites, start_date, end_date, pollutant)
+        total_expected = expected * len(names)
+        if not total_expected:
+            return {'overall': 0.0, 'sites': {}, 'valid': 0, 'expected': 0}
+
+        percent = np.round(valid / expected * 100, 1)
+        return {
+            'overall': round(float(valid.sum()) / total_expected * 100, 1),
+            'sites': {site: float(p) for site, p in zip(names, percent)},
+            'valid': int(valid.sum()),
+            'expected': int(total_expected),
+        }
+
@@ -0,0 +1,139 @@
+"""
+Annual Compliance
+Per-site, per-calendar-year exceedance counts against the UK annual
+allowances (and annual mean limits) in LIMITS, from the daily cube
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.calculations import EXCEEDANCE_RULES, LIMITS
+
+
+def compliance_objectives(standard='UK'):
+    """
+    The annual objectives LIMITS defines for a standard.
+
+    A pollutant with an 'annual_allowed' count gets an 'exceedances'
+    objective (its EXCEEDANCE_RULES metric counted per year against the
+    allowance); one with an 'annual' limit gets an 'annual_mean' objective.
+
+    Returns:
+        list: [(pollutant, objective, metric, limit, allowed)]
+    """
+    objectives = []
+    for pollutant, limits in LIMITS.get(standard, {}).items():
+        if 'annual_allowed' in limits:
+            metric, limit, _ = EXCEEDANCE_RULES[(pollutant, standard)]
+            objectives.append(
+                (pollutant, 'exceedances', metric, limit, limits['annual_allowed']))
+        if 'annual' in limits:
+            objectives.append(
+                (pollutant, 'annual_mean', 'mean', limits['annual'], None))
+    return objectives
+
+
+def _year_slices(days):
+    """
+    Split a run of calendar days into calendar years.
+
+    Returns:
+        tuple: (years, start offset of each year within days, whether
+        each year is covered in full)
+    """
+    years = days.astype("datetime64[Y]")
+    starts = np.flatnonzero(np.diff(years.astype(np.int64), prepend=-1))
+    lengths = np.diff(np.r_[starts, len(days)])
+    calendar = ((years[starts] + 1).astype("datetime64[D]")
+                - years[starts].astype("datetime64[D]")).astype(np.int64)
+    return years[starts].astype(np.int64) + 1970, starts, lengths == calendar
+
+
+def annual_compliance(store, sites, start_date, end_date, pollutants=None,
+                      standard='UK'):
+    """
+    Annual compliance for every site, calendar year and objective.
+
+    The selection is cut into calendar years (the first and last may be
+    partial) and every count is a reduceat over the daily cube's day axis,
+    so all sites and years are bucketed in one pass per objective.
+
+    Status is 'exceeded' once a count (or annual mean) is over its
+    allowance, 'compliant' for a full year within it, 'on track' for a
+    partial year within it, and 'no data' for years without readings.
+    Headroom is allowance minus count (or limit minus mean).
+
+    Args:
+        store: SiteStore whose daily_cube to read
+        sites: Site names
+        start_date, end_date: Date range (end day inclusive)
+        pollutants: Pollutants to report (default: all with objectives)
+        standard: Standard in LIMITS to take the objectives from
+
+    Returns:
+        DataFrame: One row per (site, year, pollutant, objective) with
+        columns site, year, pollutant, objective, metric, limit, allowed
+        (NaN for annual means), value, headroom, status, days (with valid
+        readings), partial
+    """
+    cube = store.daily_cube
+    names, index, day_slice = cube.window(sites, start_date, end_date)
+    days = cube.days[day_slice]
+
+    objectives = [
+        o for o in compliance_objectives(standard)
+        if o[0] in cube.pollutants and (pollutants is None or o[0] in pollutants)
+    ]
+    columns = ['site', 'year', 'pollutant', 'objective', 'metric', 'limit',
+               'allowed', 'value', 'headroom', 'status', 'days', 'partial']
+    if not names or not len(days) or not objectives:
+        return pd.DataFrame(columns=columns)
+
+    years, starts, full = _year_slices(days)
+    n_sites, n_years = len(names), len(years)
+
+    def per_year(daily):
+        """Sum a (sites, days) array into (sites, years)."""
+        return np.add.reduceat(daily, starts, axis=1)
+
+    parts = {column: [] for column in columns}
+    for pollutant, objective, metric, limit, allowed in objectives:
+        k = cube.pollutants.index(pollutant)
+        count = cube.count[index, day_slice, k]
+        pollutant_days = per_year(count > 0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if metric == 'mean':
+                total = per_year(np.nan_to_num(
+                    cube.mean[index, day_slice, k].astype(np.float64)) * count)
+                value = total / per_year(count)
+                over = value > limit
+                headroom = limit - value
+            else:
+                daily = cube.daily_exceedances(metric, limit, k, index, day_slice)
+                value = per_year(daily.astype(np.int64)).astype(np.float64)
+                over = value > allowed
+                headroom = allowed - value
+
+        has_data = pollutant_days > 0
+        partial = np.broadcast_to(~full, (n_sites, n_years))
+        status = np.where(
+            ~has_data, 'no data',
+            np.where(over, 'exceeded', np.where(partial, 'on track', 'compliant')))
+
+        n = n_sites * n_years
+        parts['site'].append(np.repeat(names, n_years))
+        parts['year'].append(np.tile(years, n_sites))
+        parts['pollutant'].append(np.full(n, pollutant, dtype=object))
+        parts['objective'].append(np.full(n, objective, dtype=object))
+        parts['metric'].append(np.full(n, metric, dtype=object))
+        parts['limit'].append(np.full(n, limit, dtype=np.float64))
+        parts['allowed'].append(np.full(n, np.nan if allowed is None else allowed))
+        parts['value'].append(np.where(has_data, value, np.nan).ravel())
+        parts['headroom'].append(np.where(has_data, headroom, np.nan).ravel())
+        parts['status'].append(status.ravel())
+        parts['days'].append(pollutant_days.ravel())
+        parts['partial'].append(partial.ravel())
+
+    # One frame from concatenated columns rather than one frame per objective
+    return pd.DataFrame({column: np.concatenate(parts[column]) for column in columns})
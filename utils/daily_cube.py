@@ -0,0 +1,287 @@
+"""
+Daily Cube
+Site × day × pollutant aggregates computed once at load time, so daily
+exceedance rules become a threshold-and-sum over an array slice
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.calculations import EXCEEDANCE_RULES, format_exceedance
+from utils.data_cache import POLLUTANT_COLUMNS
+from utils.rolling import rolling_mean_hourly
+
+
+class DailyCube:
+    """
+    Dense (site, day, pollutant) arrays over the whole calendar.
+
+    Days with no readings hold NaN means/maxes and zero counts, so they never
+    count as exceedances - the same as grouping the hourly rows by day.
+
+    Attributes:
+        sites: Site names (axis 0), in store order
+        days: datetime64[D] calendar (axis 1)
+        pollutants: Pollutant names (axis 2)
+        rows: (site, day) hourly rows recorded, whatever their values
+        count: valid (non-NaN) hours
+        mean: daily mean (float32)
+        min: daily lowest hour (float32)
+        max: daily highest hour (float32)
+        max_8h: daily highest 8-hour rolling mean (float32; NaN for
+            pollutants without an 8h rule)
+        first_max_8h: the same with windows that don't reach back past
+            midnight - the day's value when a selection starts on it
+        hours_above: {(pollutant, limit): (site, day) hours above an hourly limit}
+    """
+
+    def __init__(self, store, pollutants=POLLUTANT_COLUMNS):
+        frame = store.frame
+        self.sites = list(store.sites)
+        self.pollutants = [p for p in pollutants if p in frame.columns]
+        self._site_index = {site: i for i, site in enumerate(self.sites)}
+
+        n_sites, n_pols = len(self.sites), len(self.pollutants)
+        day_of_row = store.dates.astype("datetime64[D]")
+        if len(day_of_row):
+            first, last = day_of_row.min(), day_of_row.max()
+        else:
+            first = last = np.datetime64("1970-01-01", "D")
+        self.days = np.arange(first, last + 1, dtype="datetime64[D]")
+        n_days = len(self.days)
+
+        # store.frame is sorted by site then date, so each (site, day) is one
+        # contiguous run of rows and reduceat can aggregate it in one sweep
+        site_of_row = np.repeat(
+            np.arange(n_sites),
+            [hi - lo for lo, hi in store.bounds.values()],
+        )
+        cell = site_of_row * n_days + (day_of_row - first).astype(np.int64)
+        starts = np.flatnonzero(np.diff(cell, prepend=-1)) if len(cell) else np.array([], int)
+        sites_at, days_at = np.divmod(cell[starts], n_days)
+
+        shape = (n_sites, n_days, n_pols)
+        self.rows = np.zeros((n_sites, n_days), dtype=np.int16)
+        self.count = np.zeros(shape, dtype=np.int16)
+        self.mean = np.full(shape, np.nan, dtype=np.float32)
+        self.min = np.full(shape, np.nan, dtype=np.float32)
+        self.max = np.full(shape, np.nan, dtype=np.float32)
+        self.max_8h = np.full(shape, np.nan, dtype=np.float32)
+        self.first_max_8h = np.full(shape, np.nan, dtype=np.float32)
+        self.hours_above = {}
+
+        if not len(cell):
+            return
+
+        self.rows[sites_at, days_at] = np.diff(np.r_[starts, len(cell)])
+
+        hourly_limits = {
+            (pollutant, limit)
+            for (pollutant, _), (metric, limit, _) in EXCEEDANCE_RULES.items()
+            if metric == "hourly" and pollutant in self.pollutants
+        }
+        # Only 8h rules need the (full-length) rolling means
+        eight_hour = {
+            pollutant for (pollutant, _), (metric, _, _) in EXCEEDANCE_RULES.items()
+            if metric == "8h"
+        }
+
+        for k, pollutant in enumerate(self.pollutants):
+            values = frame[pollutant].to_numpy(dtype=np.float64)
+            valid = ~np.isnan(values)
+
+            count = np.add.reduceat(valid.astype(np.int16), starts)
+            total = np.add.reduceat(np.where(valid, values, 0.0), starts)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self.mean[sites_at, days_at, k] = np.where(count > 0, total / count, np.nan)
+            self.count[sites_at, days_at, k] = count
+            self.min[sites_at, days_at, k] = np.fmin.reduceat(values, starts)
+            self.max[sites_at, days_at, k] = np.fmax.reduceat(values, starts)
+
+            if pollutant in eight_hour:
+                rolling = store.rolling_mean(pollutant, window=8)
+                self.max_8h[sites_at, days_at, k] = np.fmax.reduceat(rolling, starts)
+
+                first = np.full(len(values), np.nan)
+                for lo, hi in store.bounds.values():
+                    first[lo:hi] = rolling_mean_hourly(
+                        store.dates[lo:hi], values[lo:hi], window=8, within_day=True)
+                self.first_max_8h[sites_at, days_at, k] = np.fmax.reduceat(first, starts)
+
+            for pol, limit in hourly_limits:
+                if pol == pollutant:
+                    above = np.zeros((n_sites, n_days), dtype=np.int16)
+                    above[sites_at, days_at] = np.add.reduceat(
+                        (values > limit).astype(np.int16), starts)
+                    self.hours_above[(pollutant, limit)] = above
+
+    def window(self, sites, start_date, end_date):
+        """
+        Axis indices for a selection.
+
+        Returns:
+            tuple: (site names present, their axis-0 indices, day slice)
+        """
+        start = np.datetime64(pd.Timestamp(start_date).date(), "D")
+        end = np.datetime64(pd.Timestamp(end_date).date(), "D")
+        lo = int(np.searchsorted(self.days, start, "left"))
+        hi = int(np.searchsorted(self.days, end, "right"))
+
+        names = [s for s in sites or [] if s in self._site_index]
+        index = np.array([self._site_index[s] for s in names], dtype=np.intp)
+        return names, index, slice(lo, hi)
+
+    def _max_8h(self, k, index, days):
+        """
+        max_8h over a (sites, days) block, as seen from a selection that
+        starts on its first day: that day's windows stop at midnight.
+        """
+        daily = self.max_8h[index, days, k].copy()
+        if daily.shape[-1]:
+            daily[..., 0] = self.first_max_8h[index, days, k][..., 0]
+        return daily
+
+    def _rule_values(self, metric, limit, k, index, days, pooled):
+        """
+        Apply one exceedance rule to a (sites, days) block.
+
+        Per-site values come back as an array over the selected sites. Pooled
+        values treat the sites as one series: a day's mean is over every
+        reading that day, and its max (hourly or 8h) is the highest at any
+        site.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if metric == "mean":
+                count = self.count[index, days, k]
+                total = np.nansum(
+                    self.mean[index, days, k].astype(np.float64) * count, axis=-1)
+                if pooled:
+                    return total.sum() / count.sum()
+                return total / count.sum(axis=-1)
+
+            if metric == "hourly":
+                above = self.hours_above[(self.pollutants[k], limit)][index, days]
+                return above.sum() if pooled else above.sum(axis=-1)
+
+            if not pooled:
+                return self.daily_exceedances(metric, limit, k, index, days).sum(axis=-1)
+
+            if metric == "daily_mean":
+                count = self.count[index, days, k]
+                daily = np.nansum(
+                    self.mean[index, days, k].astype(np.float64) * count, axis=0) / count.sum(axis=0)
+            else:
+                if metric == "daily_max":
+                    daily = self.max[index, days, k]
+                else:
+                    daily = self._max_8h(k, index, days)
+                daily = np.fmax.reduce(daily, axis=0)
+
+            return (daily > limit).sum(axis=-1)
+
+    def daily_exceedances(self, metric, limit, k, index=slice(None), days=slice(None)):
+        """
+        Exceedances per (site, day) under one non-mean rule.
+
+        Hours above the limit for 'hourly' rules, otherwise 1 on days whose
+        daily mean, daily max or 8h max is above it.
+
+        Returns:
+            ndarray: int16 (sites, days) counts
+        """
+        if metric == "hourly":
+            return self.hours_above[(self.pollutants[k], limit)][index, days]
+        if metric == "daily_mean":
+            daily = self.mean[index, days, k]
+        elif metric == "daily_max":
+            daily = self.max[index, days, k]
+        else:
+            daily = self._max_8h(k, index, days)
+        return (daily > limit).astype(np.int16)
+
+    def daily_ratio(self, metric, limit, k, index=slice(None), days=slice(None)):
+        """
+        Each (site, day) under one rule as a fraction of its limit.
+
+        The day's mean for mean rules (for an annual-mean rule, a guide to
+        which days push the mean up), its highest hour for hourly and
+        daily-max rules, and its highest 8h mean for 8h rules. Above 1 is
+        over the limit; NaN on days without readings.
+
+        Returns:
+            ndarray: float32 (sites, days)
+        """
+        if metric in ("mean", "daily_mean"):
+            daily = self.mean[index, days, k]
+        elif metric in ("hourly", "daily_max"):
+            daily = self.max[index, days, k]
+        else:
+            daily = self._max_8h(k, index, days)
+        return daily / np.float32(limit)
+
+    def exceedance(self, sites, start_date, end_date, pollutants=None,
+                   standards=('UK', 'WHO')):
+        """
+        Per-site exceedances from the cube.
+
+        Each cell applies the site's EXCEEDANCE_RULES metric to its selected
+        rows alone - the mean of its readings, hours above the limit, or days
+        whose mean, highest hour or highest 8h mean (per-site windows over
+        clock hours) is above it - as a threshold-and-sum over (sites, days)
+        instead of a groupby over hours. 8h windows on the first day don't
+        reach back before the selection.
+
+        Returns:
+            dict: {(site, pollutant, threshold_type): format_exceedance() dict}
+        """
+        names, index, days = self.window(sites, start_date, end_date)
+        has_rows = self.rows[index, days].sum(axis=1) > 0
+        pollutants = [p for p in (pollutants or self.pollutants)
+                      if p in self.pollutants]
+
+        results = {}
+        for pollutant in pollutants:
+            k = self.pollutants.index(pollutant)
+            for threshold_type in standards:
+                rule = EXCEEDANCE_RULES.get((pollutant, threshold_type))
+                if rule is None:
+                    continue
+                metric, limit, _ = rule
+
+                per_site = self._rule_values(metric, limit, k, index, days, pooled=False)
+
+                for site, value, present in zip(names, per_site, has_rows):
+                    if present:
+                        results[(site, pollutant, threshold_type)] = format_exceedance(
+                            pollutant, threshold_type, value)
+
+        return results
+
+    def pooled_exceedance(self, sites, start_date, end_date, pollutant,
+                          threshold_type='UK'):
+        """
+        One exceedance cell for all selected sites together.
+
+        The rules of exceedance(), applied to every selected site's rows as
+        one series (see _rule_values()).
+
+        Returns:
+            dict: format_exceedance() dict, or the 'No data available' cell
+        """
+        names, index, days = self.window(sites, start_date, end_date)
+        if not names or self.rows[index, days].sum() == 0 or pollutant not in self.pollutants:
+            return {
+                'value': 0,
+                'limit': 0,
+                'label': 'No data available',
+                'type': 'none'
+            }
+
+        rule = EXCEEDANCE_RULES.get((pollutant, threshold_type))
+        if rule is None:
+            return format_exceedance(pollutant, threshold_type, 0)
+
+        metric, limit, _ = rule
+        k = self.pollutants.index(pollutant)
+        value = self._rule_values(metric, limit, k, index, days, pooled=True)
+        return format_exceedance(pollutant, threshold_type, value)
@@ -0,0 +1,190 @@
+"""
+Dashboard Bundle
+One compute pass per filter change, producing everything the KPI tiles,
+summary stats, completeness panel and station cards display
+"""
+
+from dataclasses import dataclass, field
+
+from utils.calculations import (
+    STANDARDS,
+    calculate_summary_stats,
+    completeness_status,
+    format_exceedance,
+)
+from utils.data_cache import POLLUTANT_COLUMNS
+from utils.quantile_sketch import SKETCH_MIN_COUNT
+from utils.selection_cache import SelectionCache, cached_select, selection_key
+
+
+@dataclass
+class SiteResult:
+    """
+    Per-station figures for the completeness bars and station cards.
+
+    exceedance holds one format_exceedance() dict per standard.
+    """
+    site: str
+    observations: int
+    completeness: float
+    status: str
+    exceedance: dict
+
+
+@dataclass
+class DashboardBundle:
+    """
+    Everything derived from one (sites, pollutant, dates) selection.
+
+    Exceedances are computed for every standard at once, so switching
+    between UK and WHO is a lookup rather than a recompute.
+
+    Attributes:
+        rows: Hourly rows in the selection, whatever their values
+        means: {pollutant: {'mean', 'count'}} over the selection
+        exceedance: {standard: exceedance for all selected sites pooled}
+        completeness: Overall completeness percentage (valid / calendar hours)
+        summary: calculate_summary_stats() result
+        site_results: SiteResult per selected site that has data
+    """
+    sites: list
+    pollutant: str
+    standards: tuple
+    rows: int = 0
+    means: dict = field(default_factory=dict)
+    exceedance: dict = field(default_factory=dict)
+    completeness: float = 0.0
+    summary: dict = field(default_factory=dict)
+    site_results: list = field(default_factory=list)
+
+    @property
+    def empty(self):
+        return self.rows == 0
+
+
+def compute_dashboard_bundle(store, sites, pollutant, start_date, end_date,
+                             standards=STANDARDS, sketch_min_count=SKETCH_MIN_COUNT):
+    """
+    Run every aggregate the dashboard panels need in a single pass.
+
+    Everything comes from the store's precomputed aggregates, so the cost
+    doesn't grow with the date range. The rows themselves are only selected
+    for exact median/IQR on selections below sketch_min_count readings.
+
+    Args:
+        store: SiteStore to select from
+        sites: Selected site names
+        pollutant: Selected pollutant column
+        start_date, end_date: Date-picker values (end day inclusive)
+        standards: Standards to compute exceedances for (default: all in LIMITS)
+        sketch_min_count: Valid readings from which median/IQR come from the
+            quantile sketches instead of an exact pass (None = always exact)
+
+    Returns:
+        DashboardBundle
+    """
+    # Means, std and completeness are range lookups on the prefix sums
+    prefix = store.prefix_sums
+    moments = prefix.moments(sites, start_date, end_date, pollutant)
+    bundle = DashboardBundle(
+        sites=list(sites),
+        pollutant=pollutant,
+        standards=tuple(standards),
+        rows=moments['rows'],
+    )
+    if bundle.empty:
+        return bundle
+
+    for col in POLLUTANT_COLUMNS:
+        col_moments = prefix.moments(sites, start_date, end_date, col)
+        if col_moments['count'] > 0:
+            bundle.means[col] = {
+                'mean': round(col_moments['mean'], 1),
+                'count': col_moments['count'],
+            }
+
+    bundle.exceedance = {
+        standard: store.daily_cube.pooled_exceedance(
+            sites, start_date, end_date, pollutant, standard)
+        for standard in standards
+    }
+
+    # Completeness counts calendar hours, overall and per site in one popcount
+    completeness = store.hourly_validity.completeness(
+        sites, start_date, end_date, pollutant)
+    bundle.completeness = completeness['overall']
+
+    # Long ranges merge quantile sketches; small selections stay exact
+    if sketch_min_count is not None and moments['count'] >= sketch_min_count:
+        sketch = store.quantile_sketches.summary(sites, start_date, end_date, pollutant)
+        bundle.summary = calculate_summary_stats(None, pollutant, moments, sketch)
+    else:
+        df = cached_select(store, sites, start_date, end_date)
+        bundle.summary = calculate_summary_stats(df, pollutant, moments)
+
+    # Per-site exceedance is a slice of the precomputed daily cube too
+    exceedance = store.daily_cube.exceedance(
+        sites, start_date, end_date, [pollutant], standards)
+    totals = prefix.site_totals(sites, start_date, end_date, pollutant)
+
+    for site in sites:
+        if site not in totals:
+            continue
+
+        site_completeness = completeness['sites'].get(site, 0.0)
+        bundle.site_results.append(SiteResult(
+            site=site,
+            observations=totals[site]['rows'],
+            completeness=site_completeness,
+            status=completeness_status(site_completeness),
+            exceedance={
+                standard: exceedance.get(
+                    (site, pollutant, standard),
+                    format_exceedance(pollutant, standard, 0))
+                for standard in standards
+            },
+        ))
+
+    return bundle
+
+
+# Bundles are a few KB each
+bundle_cache = SelectionCache(maxsize=16)
+
+
+def bundle_request(sites, pollutant, start_date, end_date):
+    """
+    The JSON-able selection a compute callback hands to the display callbacks.
+
+    The standard is not part of it: bundles carry every standard, and the
+    UK/WHO toggle picks between them in the browser.
+
+    Returns:
+        dict or None: None when the selection is incomplete
+    """
+    if not sites or not pollutant or not start_date or not end_date:
+        return None
+    return {
+        'sites': list(sites),
+        'pollutant': pollutant,
+        'start_date': start_date,
+        'end_date': end_date,
+    }
+
+
+def get_dashboard_bundle(store, request):
+    """
+    Fetch (or compute) the bundle for a bundle_request() dict.
+
+    Display callbacks call this after the compute callback has run, so it is
+    normally a cache hit; a worker that hasn't seen the selection yet simply
+    computes it.
+    """
+    key = selection_key(
+        request['sites'], request['pollutant'],
+        request['start_date'], request['end_date'], store.version,
+    )
+    return bundle_cache.get(key, lambda: compute_dashboard_bundle(
+        store, request['sites'], request['pollutant'],
+        request['start_date'], request['end_date'],
+    ))
@@ -0,0 +1,280 @@
+"""
+Data Cache
+Columnar on-disk cache (NumPy .npy bundle) for the parsed air quality CSV,
+plus the compact dtypes the dashboard keeps in memory
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the bundle layout or the parsing rules change
+CACHE_VERSION = 2
+
+DATA_FILE = "wales_air_quality_data_16.csv"
+DATE_COLUMNS = ["date"]
+SITE_COLUMNS = ["site", "site_id", "code"]
+POLLUTANT_COLUMNS = ["NO2", "PM2.5", "PM10", "O3", "SO2"]
+
+
+def parse_csv(csv_path):
+    """
+    Read the raw CSV and parse its date columns.
+
+    Args:
+        csv_path: Path to the air quality CSV
+
+    Returns:
+        DataFrame: Parsed frame, unparseable dates coerced to NaT
+    """
+    df = pd.read_csv(csv_path)
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    return df
+
+
+def frame_memory_mb(df):
+    """Deep memory footprint of a DataFrame in megabytes."""
+    return round(df.memory_usage(deep=True).sum() / 1e6, 1)
+
+
+def compact_frame(df):
+    """
+    Shrink a parsed frame to the dtypes the dashboard needs, in place.
+
+    Site identifiers (and any other text column) become categoricals, so
+    site filters compare small integer codes instead of strings, and
+    pollutant concentrations drop to float32. Dates stay datetime64[ns].
+
+    Args:
+        df: Frame returned by parse_csv()
+
+    Returns:
+        DataFrame: The same frame with compact dtypes
+    """
+    for col in df.columns:
+        if col in SITE_COLUMNS or df[col].dtype == object:
+            df[col] = df[col].astype("category")
+        elif col in POLLUTANT_COLUMNS:
+            df[col] = df[col].astype("float32")
+    return df
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_cache_dir(csv_path):
+    """Cache bundles live in a .cache folder next to the CSV."""
+    csv_path = Path(csv_path)
+    return csv_path.resolve().parent / ".cache" / csv_path.stem
+
+
+def _fingerprint(csv_path):
+    stat = os.stat(csv_path)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": hash_file(csv_path),
+    }
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(cache_dir / "manifest.json") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _is_fresh(manifest, manifest_dir, csv_path, verify):
+    """
+    Check a manifest against the CSV on disk.
+
+    Size and mtime are compared first; the content hash is only computed when
+    the mtime moved (touch, copy, checkout) or when verify is requested.
+
+    Returns:
+        bool: True if the bundle still describes the CSV
+    """
+    if not manifest or manifest.get("version") != CACHE_VERSION:
+        return False
+
+    source = manifest["source"]
+    stat = os.stat(csv_path)
+    if stat.st_size != source["size"]:
+        return False
+
+    if stat.st_mtime_ns == source["mtime_ns"] and not verify:
+        return True
+
+    if hash_file(csv_path) != source["sha256"]:
+        return False
+
+    # Same content under a new mtime: record it so the next start skips hashing
+    if stat.st_mtime_ns != source["mtime_ns"]:
+        source["mtime_ns"] = stat.st_mtime_ns
+        try:
+            with open(Path(manifest_dir) / "manifest.json", "w") as fh:
+                json.dump(manifest, fh, indent=2)
+        except OSError:
+            pass
+    return True
+
+
+def write_bundle(df, cache_dir, source, parsed_mb=None):
+    """
+    Write a parsed frame as one .npy file per column plus a manifest.
+
+    Datetime columns are stored as int64 nanoseconds, numeric columns as-is,
+    and categoricals (or any other text) as integer codes with a separate
+    categories array.
+    The bundle is written to a temporary folder and swapped in at the end so
+    readers never see a half-written cache.
+    """
+    cache_dir = Path(cache_dir)
+    tmp_dir = cache_dir.with_name(f"{cache_dir.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        entry = {"name": col, "file": f"col_{i}.npy"}
+
+        if pd.api.types.is_datetime64_any_dtype(series):
+            entry["kind"] = "datetime"
+            values = series.to_numpy(dtype="datetime64[ns]").view("int64")
+        elif pd.api.types.is_numeric_dtype(series):
+            entry["kind"] = "numeric"
+            values = series.to_numpy()
+        else:
+            entry["kind"] = "category"
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype("category")
+            values = series.cat.codes.to_numpy()
+            categories = series.cat.categories.to_numpy()
+            if categories.dtype == object:
+                categories = categories.astype(str)
+            entry["categories"] = f"col_{i}.categories.npy"
+            np.save(tmp_dir / entry["categories"], categories,
+                    allow_pickle=False)
+
+        np.save(tmp_dir / entry["file"], values, allow_pickle=False)
+        columns.append(entry)
+
+    manifest = {
+        "version": CACHE_VERSION,
+        "source": source,
+        "rows": len(df),
+        "parsed_mb": parsed_mb,
+        "columns": columns,
+    }
+    with open(tmp_dir / "manifest.json", "w") as fh:
+        json.dump(manifest, fh, indent=2)
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+
+
+def read_bundle(cache_dir, manifest):
+    """
+    Rebuild the parsed frame from a bundle, memory-mapping each column.
+
+    The frame's columns are read-only views over the mapped .npy files, not
+    copies: pages are read from disk as they are touched, and the OS shares
+    them between every process loading the same bundle.
+
+    Returns:
+        DataFrame: Same columns and dtypes that were written
+    """
+    cache_dir = Path(cache_dir)
+    data = {}
+    for entry in manifest["columns"]:
+        values = np.load(cache_dir / entry["file"], mmap_mode="r")
+
+        if entry["kind"] == "datetime":
+            data[entry["name"]] = values.view("datetime64[ns]")
+        elif entry["kind"] == "numeric":
+            data[entry["name"]] = values
+        else:
+            categories = np.load(cache_dir / entry["categories"])
+            data[entry["name"]] = pd.Categorical.from_codes(
+                values, categories)
+
+    # copy=False keeps each column a view rather than consolidating them
+    return pd.DataFrame(data, copy=False)
+
+
+def _log_memory(parsed_mb, compact_mb):
+    if parsed_mb:
+        logger.info("wales_df memory: %.1f MB parsed -> %.1f MB compact (%.0f%% saved)",
+                    parsed_mb, compact_mb, 100 * (1 - compact_mb / parsed_mb))
+    else:
+        logger.info("wales_df memory: %.1f MB compact", compact_mb)
+
+
+def load_wales_data(csv_path=DATA_FILE, cache_dir=None, verify=False, shared=False):
+    """
+    Load the air quality dataset, using the columnar cache when it is fresh.
+
+    The first call parses the CSV, compacts it and writes the bundle; later
+    calls map the bundle instead. The cache is rebuilt whenever the CSV's
+    size, mtime or content hash no longer matches the manifest. Memory use
+    before and after compaction is logged either way.
+
+    Args:
+        csv_path: Path to the air quality CSV
+        cache_dir: Bundle folder (defaults to .cache/<csv name> next to the CSV)
+        verify: Always confirm the content hash, even if size and mtime match
+        shared: Return read-only views over one memory-mapped file that
+            every process loading the data shares (see utils.shared_store)
+
+    Returns:
+        DataFrame: Wide-format data with a parsed 'date' column, categorical
+        site identifiers and float32 pollutant columns
+    """
+    if shared:
+        from utils.shared_store import load_shared_frame
+        return load_shared_frame(csv_path, cache_dir, verify)
+
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir(csv_path)
+    manifest = _read_manifest(cache_dir)
+
+    if _is_fresh(manifest, cache_dir, csv_path, verify):
+        try:
+            df = read_bundle(cache_dir, manifest)
+            logger.info("Loaded %s rows from cache %s", len(df), cache_dir)
+            _log_memory(manifest.get("parsed_mb"), frame_memory_mb(df))
+            return df
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Ignoring unreadable cache %s: %s", cache_dir, exc)
+
+    df = parse_csv(csv_path)
+    parsed_mb = frame_memory_mb(df)
+    compact_frame(df)
+    _log_memory(parsed_mb, frame_memory_mb(df))
+
+    try:
+        write_bundle(df, cache_dir, _fingerprint(csv_path), parsed_mb)
+        logger.info("Cached %s rows to %s", len(df), cache_dir)
+    except OSError as exc:
+        # A read-only checkout still works, it just parses on every start
+        logger.warning("Could not write cache %s: %s", cache_dir, exc)
+
+    return df
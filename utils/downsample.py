@@ -0,0 +1,152 @@
+"""
+Downsampling
+Min/max-per-bucket reduction of time series for plotting, keeping peaks
+and gaps while capping the points sent to the browser
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Points per trace; a few thousand is more than a chart's pixel width
+MAX_POINTS_PER_TRACE = 2000
+
+
+def minmax_downsample(dates, values, max_points=MAX_POINTS_PER_TRACE):
+    """
+    Reduce one time series to at most about max_points points.
+
+    The time span is cut into max_points // 2 equal buckets and each bucket
+    keeps its lowest and highest reading, in time order - so every peak
+    (and trough) survives. A run of buckets with no valid readings becomes
+    a single NaN point, which breaks the line under connectgaps=False; gaps
+    shorter than one bucket are below the chart's resolution and are
+    bridged. A gap needs an empty bucket, so the output never exceeds
+    max_points.
+
+    Args:
+        dates: datetime64[ns] array, sorted
+        values: Readings aligned with dates (NaN = missing)
+        max_points: Point budget
+
+    Returns:
+        tuple: (dates, values) arrays; the input unchanged when it already
+        fits the budget
+    """
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    values = np.asarray(values)
+    if len(values) <= max_points:
+        return dates, values
+
+    n_buckets = max(max_points // 2, 1)
+    ticks = dates.astype(np.int64)
+    # Bucket width in whole seconds, so gap markers land on clean timestamps
+    first = ticks[0]
+    second = 10 ** 9
+    width = -(-(ticks[-1] - first + 1) // (n_buckets * second)) * second
+    bucket = (ticks - first) // width
+
+    valid = np.flatnonzero(~np.isnan(values))
+    if not len(valid):
+        return dates[:1], values[:1]
+
+    # Sort valid rows by (bucket, value): each bucket's first row is its
+    # minimum and its last row its maximum
+    order = valid[np.lexsort((values[valid], bucket[valid]))]
+    ordered_buckets = bucket[order]
+    starts = np.flatnonzero(np.diff(ordered_buckets, prepend=-1))
+    stops = np.r_[starts[1:], len(order)] - 1
+    lows, highs = order[starts], order[stops]
+
+    keep = np.unique(np.r_[lows, highs])
+    out_dates = dates[keep]
+    out_values = values[keep].astype(np.float64)
+
+    # One NaN wherever a run of buckets has no valid readings
+    occupied = ordered_buckets[starts]
+    gap_after = np.flatnonzero(np.diff(occupied) > 1)
+    if len(gap_after):
+        gap_ticks = first + (occupied[gap_after] + 1) * width
+        insert_at = np.searchsorted(out_dates.astype(np.int64), gap_ticks)
+        out_dates = np.insert(out_dates, insert_at, gap_ticks.astype("datetime64[ns]"))
+        out_values = np.insert(out_values, insert_at, np.nan)
+
+    return out_dates, out_values
+
+
+def points_for_width(width, default=MAX_POINTS_PER_TRACE):
+    """Point budget for a chart width: a bucket's min and max per pixel column."""
+    return int(width) * 2 if width else default
+
+
+def _trace_frame(site, dates, values, pollutant, max_points):
+    site_dates, site_values = minmax_downsample(dates, values, max_points)
+    return pd.DataFrame({
+        'date': site_dates,
+        'site': str(site),
+        pollutant: site_values,
+    })
+
+
+def _traces(frames, pollutant):
+    if not frames:
+        return pd.DataFrame(columns=['date', 'site', pollutant])
+    return pd.concat(frames, ignore_index=True)
+
+
+def downsample_by_site(df, pollutant, max_points=MAX_POINTS_PER_TRACE):
+    """
+    minmax_downsample() each site's series of a selection.
+
+    Args:
+        df: Selection with 'date', 'site' and the pollutant column, each
+            site's rows sorted by date (as SiteStore returns them)
+        pollutant: Column to plot
+        max_points: Point budget per site
+
+    Returns:
+        DataFrame: date, site (str) and pollutant columns, ready for px.line
+    """
+    dates = df['date'].to_numpy(dtype="datetime64[ns]")
+    values = df[pollutant].to_numpy()
+
+    frames = [
+        _trace_frame(site, dates[positions], values[positions], pollutant, max_points)
+        for site, positions in df.groupby('site', observed=True, sort=False).indices.items()
+    ]
+    return _traces(frames, pollutant)
+
+
+def downsample_window(store, sites, pollutant, start, end, max_points=MAX_POINTS_PER_TRACE):
+    """
+    Downsampled traces for a time window, straight from the store's arrays.
+
+    For zoomed views: each site's window is two binary searches into its
+    sorted dates, and the slice is reduced without building a selection
+    frame. One reading either side of the window is included so lines run
+    to the plot edges.
+
+    Args:
+        store: SiteStore
+        sites: Site names
+        pollutant: Column to plot
+        start, end: Timestamps bounding the window (end exclusive)
+        max_points: Point budget per site
+
+    Returns:
+        DataFrame: As downsample_by_site()
+    """
+    values = store.frame[pollutant].to_numpy()
+    wanted = set(sites or [])
+
+    frames = []
+    for site in store.sites:
+        if site not in wanted:
+            continue
+        lo, hi = store.site_range(site, start, end)
+        first, last = store.bounds[site]
+        lo, hi = max(lo - 1, first), min(hi + 1, last)
+        if hi > lo:
+            frames.append(_trace_frame(
+                site, store.dates[lo:hi], values[lo:hi], pollutant, max_points))
+    return _traces(frames, pollutant)
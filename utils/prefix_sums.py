@@ -0,0 +1,138 @@
+"""
+Prefix Sums
+Cumulative sum, sum of squares and valid count per pollutant over the
+site-partitioned rows, for constant-time range mean, std and completeness
+"""
+
+import numpy as np
+
+from utils.data_cache import POLLUTANT_COLUMNS
+from utils.site_store import date_bounds
+
+
+class PrefixSums:
+    """
+    Running totals over SiteStore.frame, one column per pollutant.
+
+    Each site's hourly rows are contiguous in the store, so the totals for a
+    site over any date range are P[hi] - P[lo] once the store has found lo/hi
+    by binary search - no pass over the readings themselves.
+
+    The totals are kept at the start of each (site, day) run of rows rather
+    than at every row, which holds them in about 1/24 of the memory. Date
+    picker ranges start and end on day boundaries, so they are answered from
+    the block totals alone; a range that cuts into a day adds the few rows
+    of that day directly.
+
+    Attributes:
+        pollutants: Column order of the arrays
+        starts: (blocks + 1,) row where each (site, day) block starts, then
+            the row count
+        count: (blocks + 1, pollutants) int32 valid readings before each start
+        sum: float64 sum of valid readings before each start
+        sumsq: float64 sum of squared valid readings before each start
+    """
+
+    def __init__(self, store, pollutants=POLLUTANT_COLUMNS):
+        self.store = store
+        self.pollutants = [p for p in pollutants if p in store.frame.columns]
+
+        # Store order is site then date, so a (site, day) block is one run
+        rows = len(store.frame)
+        day = store.dates.astype("datetime64[D]").astype(np.int64)
+        site = np.repeat(np.arange(len(store.bounds)),
+                         [hi - lo for lo, hi in store.bounds.values()])
+        if rows:
+            changed = np.r_[True, (np.diff(day) != 0) | (np.diff(site) != 0)]
+            starts = np.flatnonzero(changed)
+        else:
+            starts = np.array([], dtype=np.intp)
+        self.starts = np.r_[starts, rows]
+
+        shape = (len(self.starts), len(self.pollutants))
+        self.count = np.zeros(shape, dtype=np.int32)
+        self.sum = np.zeros(shape, dtype=np.float64)
+        self.sumsq = np.zeros(shape, dtype=np.float64)
+        if not rows:
+            return
+
+        for k, pollutant in enumerate(self.pollutants):
+            values = store.frame[pollutant].to_numpy(dtype=np.float64)
+            valid = ~np.isnan(values)
+            values = np.where(valid, values, 0.0)
+            np.cumsum(np.add.reduceat(valid.astype(np.int32), starts),
+                      out=self.count[1:, k])
+            np.cumsum(np.add.reduceat(values, starts), out=self.sum[1:, k])
+            np.cumsum(np.add.reduceat(values * values, starts), out=self.sumsq[1:, k])
+
+    def _rows(self, lo, hi, k):
+        """(count, sum, sumsq) of rows lo:hi read directly."""
+        values = self.store.frame[self.pollutants[k]].to_numpy()[lo:hi].astype(np.float64)
+        values = values[~np.isnan(values)]
+        return len(values), values.sum(), (values * values).sum()
+
+    def _totals(self, lo, hi, k):
+        """(count, sum, sumsq) of rows lo:hi, from the block totals where possible."""
+        first = int(np.searchsorted(self.starts, lo, "left"))
+        last = int(np.searchsorted(self.starts, hi, "right")) - 1
+        if first > last:
+            # Within one block
+            return self._rows(lo, hi, k)
+
+        a, b = self.starts[first], self.starts[last]
+        count = int(self.count[last, k]) - int(self.count[first, k])
+        total = self.sum[last, k] - self.sum[first, k]
+        sumsq = self.sumsq[last, k] - self.sumsq[first, k]
+        # Partial days at either end
+        for edge_lo, edge_hi in ((lo, a), (b, hi)):
+            if edge_hi > edge_lo:
+                n, s, ss = self._rows(edge_lo, edge_hi, k)
+                count, total, sumsq = count + n, total + s, sumsq + ss
+        return count, total, sumsq
+
+    def site_totals(self, sites, start_date, end_date, pollutant):
+        """
+        Per-site totals over a date range (end day inclusive).
+
+        Returns:
+            dict: {site: {'rows', 'count', 'sum', 'sumsq'}} for sites with rows
+        """
+        if pollutant not in self.pollutants:
+            return {}
+        k = self.pollutants.index(pollutant)
+        start, end = date_bounds(start_date, end_date)
+
+        totals = {}
+        for site in sites or []:
+            lo, hi = self.store.site_range(site, start, end)
+            if hi > lo:
+                count, total, sumsq = self._totals(lo, hi, k)
+                totals[site] = {
+                    'rows': hi - lo,
+                    'count': count,
+                    'sum': total,
+                    'sumsq': sumsq,
+                }
+        return totals
+
+    def moments(self, sites, start_date, end_date, pollutant):
+        """
+        Pooled mean, sample std and completeness over several sites.
+
+        Returns:
+            dict: {'rows', 'count', 'mean', 'std', 'completeness'}; mean/std
+            are None with no valid readings, std also with a single one
+        """
+        totals = self.site_totals(sites, start_date, end_date, pollutant)
+        rows = sum(t['rows'] for t in totals.values())
+        n = sum(t['count'] for t in totals.values())
+        s = sum(t['sum'] for t in totals.values())
+        ss = sum(t['sumsq'] for t in totals.values())
+
+        return {
+            'rows': rows,
+            'count': n,
+            'mean': s / n if n else None,
+            'std': float(np.sqrt(max(ss - s * s / n, 0.0) / (n - 1))) if n > 1 else None,
+            'completeness': round(n / rows * 100, 1) if rows else 0.0,
+        }
@@ -0,0 +1,52 @@
+"""
+Process Memory
+Resident, proportional and private memory of the current process, for
+logging how much of the data each worker really holds
+"""
+
+import os
+
+
+def memory_mb():
+    """
+    This process's memory in MB, from /proc (Linux only).
+
+    RSS counts every resident page, including those shared with other
+    processes (forked workers, or any process mapping the same file). PSS
+    splits each shared page between the processes sharing it, so the
+    workers' PSS adds up to their real total. Private is what this process
+    alone holds.
+
+    Returns:
+        dict: {rss, pss, private}, or None where /proc is unavailable
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = {line.split(":")[0]: int(line.split()[1]) for line in f
+                      if line.split()[-1:] == ["kB"]}
+        return {
+            "rss": fields["Rss"] / 1024,
+            "pss": fields["Pss"] / 1024,
+            "private": (fields["Private_Clean"] + fields["Private_Dirty"]) / 1024,
+        }
+    except (OSError, KeyError, ValueError):
+        pass
+
+    # Older kernels: statm gives resident and file-backed shared pages only
+    try:
+        with open("/proc/self/statm") as f:
+            _, resident, shared = (int(n) for n in f.read().split()[:3])
+    except OSError:
+        return None
+    page = os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    return {"rss": resident * page, "pss": None, "private": (resident - shared) * page}
+
+
+def memory_report(label):
+    """One log line with memory_mb() for this process."""
+    memory = memory_mb()
+    if memory is None:
+        return f"{label} (pid {os.getpid()}): memory not available on this platform"
+    pss = "n/a" if memory["pss"] is None else f"{memory['pss']:.1f} MB"
+    return (f"{label} (pid {os.getpid()}): RSS {memory['rss']:.1f} MB, "
+            f"PSS {pss}, private {memory['private']:.1f} MB")
@@ -0,0 +1,114 @@
+"""
+Resolution Pyramid
+Daily, weekly and monthly mean/min/max per site and pollutant, with the
+coarsest adequate level picked for a chart's time span
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Levels from finest to coarsest, with their nominal bucket length
+LEVELS = {
+    'hourly': pd.Timedelta(hours=1),
+    'daily': pd.Timedelta(days=1),
+    'weekly': pd.Timedelta(days=7),
+    'monthly': pd.Timedelta(days=30.44),
+}
+
+# A level is used only if the span still gives at least this many buckets
+MIN_POINTS = 200
+
+# Weeks start on Monday; 1969-12-29 was one
+_MONDAY = np.datetime64("1969-12-29", "D")
+
+
+class ResolutionPyramid:
+    """
+    Mean, min and max per (site, bucket, pollutant) at each coarse level.
+
+    The daily level is the daily cube itself; weekly and monthly buckets
+    are rolled up from it (count-weighted means, min of mins, max of
+    maxes). Buckets cover the whole calendar, so a bucket with no readings
+    is NaN and shows as a gap. The hourly level is the store's own rows.
+
+    Attributes:
+        sites, pollutants: As in the daily cube
+        times: {level: datetime64[D] start of each bucket}
+        ends: {level: datetime64[D] end of each bucket (exclusive)}
+        mean, min, max: {level: (sites, buckets, pollutants) float32}
+    """
+
+    def __init__(self, cube):
+        self.sites = list(cube.sites)
+        self.pollutants = list(cube.pollutants)
+        self._site_index = {site: i for i, site in enumerate(self.sites)}
+
+        self.times = {'daily': cube.days}
+        self.ends = {'daily': cube.days + 1}
+        self.mean = {'daily': cube.mean}
+        self.min = {'daily': cube.min}
+        self.max = {'daily': cube.max}
+
+        days = cube.days
+        weeks = (days - _MONDAY).astype(np.int64) // 7
+        months = days.astype("datetime64[M]").astype(np.int64)
+        weighted = np.nan_to_num(cube.mean.astype(np.float64)) * cube.count
+        count = cube.count.astype(np.int64)
+
+        for level, bucket in (('weekly', weeks), ('monthly', months)):
+            starts = np.flatnonzero(np.diff(bucket, prepend=bucket[0] - 1))
+            self.times[level] = days[starts]
+            self.ends[level] = np.r_[days[starts[1:]], days[-1:] + 1]
+
+            total = np.add.reduceat(weighted, starts, axis=1)
+            n = np.add.reduceat(count, starts, axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self.mean[level] = np.where(n > 0, total / n, np.nan).astype(np.float32)
+            self.min[level] = np.fmin.reduceat(cube.min, starts, axis=1)
+            self.max[level] = np.fmax.reduceat(cube.max, starts, axis=1)
+
+    @staticmethod
+    def choose_level(start, end, min_points=MIN_POINTS):
+        """
+        Coarsest level that still gives min_points buckets over [start, end).
+
+        A 5-year span gives about 260 weekly buckets, so it reads the weekly
+        level; a one-year span falls through to daily, a month to hourly.
+        """
+        span = pd.Timestamp(end) - pd.Timestamp(start)
+        for level in reversed(list(LEVELS)):
+            if span / LEVELS[level] >= min_points:
+                return level
+        return 'hourly'
+
+    def series(self, sites, pollutant, start, end, level):
+        """
+        Buckets overlapping [start, end) for several sites at one level.
+
+        Returns:
+            DataFrame: date, site (str), mean, min, max; empty for the
+            hourly level or an unknown pollutant
+        """
+        columns = ['date', 'site', 'mean', 'min', 'max']
+        if level not in self.times or pollutant not in self.pollutants:
+            return pd.DataFrame(columns=columns)
+
+        times = self.times[level]
+        # From the first bucket ending after start to the last starting before end
+        first = pd.Timestamp(start).floor('D').to_datetime64().astype("datetime64[D]")
+        last = pd.Timestamp(end).ceil('D').to_datetime64().astype("datetime64[D]")
+        lo = int(np.searchsorted(self.ends[level], first, "right"))
+        hi = max(int(np.searchsorted(times, last, "left")), lo)
+        k = self.pollutants.index(pollutant)
+        names = [s for s in self.sites if s in set(sites or [])]
+        index = np.array([self._site_index[s] for s in names], dtype=np.intp)
+
+        n = hi - lo
+        return pd.DataFrame({
+            'date': np.tile(times[lo:hi], len(names)).astype("datetime64[ns]"),
+            'site': np.repeat([str(s) for s in names], n),
+            'mean': self.mean[level][index, lo:hi, k].ravel(),
+            'min': self.min[level][index, lo:hi, k].ravel(),
+            'max': self.max[level][index, lo:hi, k].ravel(),
+        }, columns=columns)
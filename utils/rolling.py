@@ -0,0 +1,73 @@
+"""
+Rolling Windows
+Gap-aware rolling means on a true hourly time axis, one site at a time
+"""
+
+import numpy as np
+
+
+# An 8-hour mean counts when at least 75% of its hours (6 of 8) were measured
+MIN_VALID_HOURS = 6
+
+HOUR = np.timedelta64(1, "h")
+
+
+def rolling_mean_hourly(dates, values, window=8, min_valid=MIN_VALID_HOURS,
+                        within_day=False):
+    """
+    Trailing rolling mean over clock hours for a single site.
+
+    Readings are placed on a dense hourly axis first, so a window always
+    covers `window` consecutive clock hours: missing hours (with or without a
+    row) shorten the window's valid count instead of pulling in older
+    readings. Computed with cumulative sums - no Python loop over rows.
+
+    Args:
+        dates: datetime64 array of one site's reading times (any order)
+        values: Readings aligned with dates (NaN = missing)
+        window: Window length in hours
+        min_valid: Fewest valid hours for a window to produce a mean
+        within_day: Stop windows at the start of their day, as if each day
+            were the first of the series (a selection starting that day)
+
+    Returns:
+        ndarray: float64 mean of the window ending at each row's hour, NaN
+        where fewer than min_valid hours were valid
+    """
+    values = np.asarray(values, dtype=np.float64)
+    hours = np.asarray(dates, dtype="datetime64[h]")
+    dated = ~np.isnat(hours)
+    if not dated.all():
+        out = np.full(len(values), np.nan)
+        out[dated] = rolling_mean_hourly(
+            hours[dated], values[dated], window, min_valid, within_day)
+        return out
+    if len(values) == 0:
+        return values.copy()
+
+    hour_index = (hours - hours.min()) // HOUR
+    n_hours = int(hour_index.max()) + 1
+
+    # Hourly mean on the dense axis (averages duplicate rows for one hour)
+    valid = ~np.isnan(values)
+    hour_sum = np.bincount(hour_index[valid], weights=values[valid], minlength=n_hours)
+    hour_n = np.bincount(hour_index[valid], minlength=n_hours)
+    has_value = hour_n > 0
+    hourly = np.divide(hour_sum, hour_n, out=np.zeros(n_hours), where=has_value)
+
+    csum = np.concatenate(([0.0], np.cumsum(hourly)))
+    ccount = np.concatenate(([0], np.cumsum(has_value)))
+    end = np.arange(1, n_hours + 1)
+    begin = np.maximum(end - window, 0)
+    if within_day:
+        # Position of midnight on the day of each window's last hour
+        first = hours.min().astype(np.int64)
+        begin = np.maximum(begin, end - 1 - (first + end - 1) % 24)
+    window_sum = csum[end] - csum[begin]
+    window_count = ccount[end] - ccount[begin]
+
+    means = np.full(n_hours, np.nan)
+    ok = window_count >= min_valid
+    means[ok] = window_sum[ok] / window_count[ok]
+    return means[hour_index]
+
@@ -0,0 +1,158 @@
+"""
+Selection Cache
+Process-wide LRU memoisation of filtered selections, shared by every callback
+"""
+
+import threading
+from collections import OrderedDict
+
+from utils.site_store import date_bounds
+
+
+# Budget for cached selections per process: a few full-range selections
+SELECTION_CACHE_BYTES = 32 * 1024 ** 2
+
+
+def frame_bytes(df):
+    """Memory held by a cached frame, as counted against maxbytes."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+class SelectionCache:
+    """
+    Size-bounded LRU cache with hit/miss counters.
+
+    Bounded by entry count, and optionally by the bytes the entries hold
+    (measured by sizeof); a value larger than maxbytes on its own is
+    returned without being cached.
+
+    Concurrent requests for the same key wait for the first one to finish,
+    so a selection that fans out to several callbacks is computed once per
+    process even when Dash runs those callbacks in parallel threads.
+    """
+
+    def __init__(self, maxsize=32, maxbytes=None, sizeof=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, key, compute):
+        """
+        Return the cached value for key, calling compute() on a miss.
+
+        Args:
+            key: Hashable key (see selection_key)
+            compute: Zero-argument function producing the value
+
+        Returns:
+            The cached or freshly computed value
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            try:
+                # Another thread may have filled the entry while we waited
+                with self._lock:
+                    if key in self._data:
+                        self._data.move_to_end(key)
+                        self.hits += 1
+                        return self._data[key]
+
+                value = compute()
+                size = self.sizeof(value) if self.sizeof is not None else 0
+
+                with self._lock:
+                    self.misses += 1
+                    if self.maxbytes is None or size <= self.maxbytes:
+                        self._data[key] = value
+                        self._sizes[key] = size
+                        self.nbytes += size
+                        self._evict()
+            finally:
+                # Also when compute() raised, so the next caller retries
+                with self._lock:
+                    self._key_locks.pop(key, None)
+
+        return value
+
+    def _evict(self):
+        """Drop least recently used entries until within both bounds."""
+        while self._data and (
+                len(self._data) > self.maxsize
+                or (self.maxbytes is not None and self.nbytes > self.maxbytes)):
+            key, _ = self._data.popitem(last=False)
+            self.nbytes -= self._sizes.pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """Return {hits, misses, size, maxsize, bytes, maxbytes} for logging or debugging."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'bytes': self.nbytes,
+                'maxbytes': self.maxbytes,
+            }
+
+
+# One cache per worker process, shared by all callbacks; every entry is a
+# copy of the selected rows, so it is bounded by bytes as well as entries
+selection_cache = SelectionCache(maxbytes=SELECTION_CACHE_BYTES, sizeof=frame_bytes)
+
+
+def selection_key(sites, pollutant, start_date, end_date, version=None):
+    """
+    Normalise a filter selection into a cache key.
+
+    Site order and the exact date-picker string format don't matter:
+    ['B', 'A'] and ['A', 'B'] over '2021-01-01'..'2021-01-31' map to one key.
+    """
+    start, end = date_bounds(start_date, end_date)
+    return (
+        tuple(sorted(sites or [])),
+        pollutant,
+        start.isoformat(),
+        end.isoformat(),
+        version,
+    )
+
+
+def cached_select(store, sites, start_date, end_date, cache=None):
+    """
+    store.select() through the shared selection cache.
+
+    The rows carry every pollutant, so the key leaves the pollutant out and
+    switching pollutant reuses the same entry. The returned frame is shared
+    between callers and must not be modified.
+
+    Args:
+        store: SiteStore to select from
+        sites, start_date, end_date: Current filter values
+        cache: SelectionCache to use (defaults to the process-wide one)
+
+    Returns:
+        DataFrame: Rows for the selected sites and dates
+    """
+    cache = cache if cache is not None else selection_cache
+    key = selection_key(sites, None, start_date, end_date, store.version)
+    return cache.get(key, lambda: store.select(sites, start_date, end_date))
@@ -0,0 +1,196 @@
+"""
+Shared Store
+The dashboard's numeric columns in one memory-mapped file, in SiteStore
+order, so every process that loads the data maps the same pages
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.data_cache import (
+    CACHE_VERSION,
+    DATA_FILE,
+    POLLUTANT_COLUMNS,
+    _is_fresh,
+    _read_manifest,
+    default_cache_dir,
+    load_wales_data,
+)
+from utils.site_store import SiteStore
+
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the file layout changes
+SHARED_VERSION = 1
+
+HEADER_NAME = "shared_store.json"
+
+
+def write_shared_store(store, cache_dir, source):
+    """
+    Write a SiteStore's dates, site codes and pollutants to one file.
+
+    Layout: int64 nanosecond dates (rows), then float32 pollutants as one
+    (pollutants, rows) block so each column is contiguous, then the site
+    codes. A JSON header beside it holds the offsets, site names, source
+    fingerprint and the data file's name, which is unique to the source:
+    the header is swapped in last, so a reader always finds the data file
+    it describes, and older files are removed (processes that mapped one
+    keep their mapping).
+
+    Args:
+        store: SiteStore whose frame to write (already in site, date order)
+        cache_dir: Folder to write into (the bundle's cache folder)
+        source: Fingerprint of the CSV, as in the bundle manifest
+
+    Returns:
+        Path: The data file written
+    """
+    cache_dir = Path(cache_dir)
+    frame = store.frame
+    rows = len(frame)
+    pollutants = [p for p in POLLUTANT_COLUMNS if p in frame.columns]
+
+    site = frame["site"]
+    if not isinstance(site.dtype, pd.CategoricalDtype):
+        site = site.astype("category")
+    codes = site.cat.codes.to_numpy()
+
+    dates_at = 0
+    values_at = dates_at + rows * 8
+    codes_at = values_at + rows * 4 * len(pollutants)
+    size = codes_at + rows * codes.itemsize
+
+    data_name = f"shared_store.{source['sha256'][:16]}.bin"
+    tmp = f".tmp-{os.getpid()}"
+    mapped = np.memmap(cache_dir / (data_name + tmp), dtype=np.uint8,
+                       mode="w+", shape=(max(size, 1),))
+    mapped[dates_at:values_at].view(np.int64)[:] = store.dates.view(np.int64)
+    values = mapped[values_at:codes_at].view(np.float32).reshape(len(pollutants), rows)
+    for k, pollutant in enumerate(pollutants):
+        values[k] = frame[pollutant].to_numpy(dtype=np.float32)
+    mapped[codes_at:size].view(codes.dtype)[:] = codes
+    mapped.flush()
+    del mapped, values
+
+    header = {
+        "version": SHARED_VERSION,
+        "bundle_version": CACHE_VERSION,
+        "source": source,
+        "rows": rows,
+        "sites": [str(s) for s in site.cat.categories],
+        "pollutants": pollutants,
+        "codes_dtype": codes.dtype.str,
+        "offsets": {"dates": dates_at, "values": values_at, "codes": codes_at},
+        "file": data_name,
+    }
+    with open(cache_dir / (HEADER_NAME + tmp), "w") as fh:
+        json.dump(header, fh, indent=2)
+
+    os.replace(cache_dir / (data_name + tmp), cache_dir / data_name)
+    os.replace(cache_dir / (HEADER_NAME + tmp), cache_dir / HEADER_NAME)
+
+    for old in cache_dir.glob("shared_store.*.bin"):
+        if old.name != data_name:
+            old.unlink(missing_ok=True)
+    return cache_dir / data_name
+
+
+def attach_shared_frame(cache_dir):
+    """
+    Map the shared file read-only and wrap it in a wales_df-like frame.
+
+    No data is copied: date, site and pollutant columns are views over the
+    mapping (pandas keeps them as separate blocks, so nothing is
+    consolidated), and the OS shares its pages between every process
+    mapping the file. The columns are read-only.
+
+    Returns:
+        DataFrame: date, site (categorical) and float32 pollutant columns,
+        in site, date order
+    """
+    cache_dir = Path(cache_dir)
+    with open(cache_dir / HEADER_NAME) as fh:
+        header = json.load(fh)
+
+    rows, pollutants = header["rows"], header["pollutants"]
+    offsets = header["offsets"]
+    mapped = np.memmap(cache_dir / header["file"], dtype=np.uint8, mode="r")
+
+    dates = mapped[offsets["dates"]:offsets["values"]].view("datetime64[ns]")
+    values = mapped[offsets["values"]:offsets["codes"]].view(np.float32)
+    values = values.reshape(len(pollutants), rows)
+    codes = mapped[offsets["codes"]:].view(np.dtype(header["codes_dtype"]))[:rows]
+
+    keys = pd.DataFrame({
+        "date": dates,
+        "site": pd.Categorical.from_codes(codes, header["sites"]),
+    }, copy=False)
+    # One (rows, pollutants) block viewing the (pollutants, rows) layout
+    readings = pd.DataFrame(values.T, columns=pollutants, copy=False)
+    return pd.concat([keys, readings], axis=1, copy=False)
+
+
+def _is_current(cache_dir, manifest):
+    """Whether the shared file was written from the current bundle."""
+    header = _read_header(cache_dir)
+    return (
+        header is not None and manifest is not None
+        and header.get("version") == SHARED_VERSION
+        and header.get("bundle_version") == manifest.get("version")
+        and header.get("source", {}).get("sha256") == manifest["source"]["sha256"]
+        and (Path(cache_dir) / header["file"]).exists()
+    )
+
+
+def _read_header(cache_dir):
+    try:
+        with open(Path(cache_dir) / HEADER_NAME) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def load_shared_frame(csv_path=DATA_FILE, cache_dir=None, verify=False):
+    """
+    The data as views over the shared file, building it if needed.
+
+    A process that finds the file current maps it without loading the
+    data at all. Otherwise the data is loaded through load_wales_data()
+    (which refreshes the .npy bundle) and the file is rewritten. The
+    site_id and code columns, which the dashboard doesn't use, are left
+    out. Where the file can't be written, the loaded frame is returned
+    as it is.
+
+    Args:
+        csv_path, cache_dir, verify: As load_wales_data()
+
+    Returns:
+        DataFrame: See attach_shared_frame()
+    """
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir(csv_path)
+    manifest = _read_manifest(cache_dir)
+
+    if not (_is_fresh(manifest, cache_dir, csv_path, verify)
+            and _is_current(cache_dir, manifest)):
+        df = load_wales_data(csv_path, cache_dir, verify)
+        manifest = _read_manifest(cache_dir)
+        try:
+            if manifest is None:
+                raise OSError("no bundle manifest")
+            path = write_shared_store(SiteStore(df), cache_dir, manifest["source"])
+            logger.info("Wrote shared store %s", path)
+        except OSError as exc:
+            logger.warning("Could not write shared store in %s: %s", cache_dir, exc)
+            return df
+        del df
+
+    frame = attach_shared_frame(cache_dir)
+    logger.info("Attached shared store in %s (%s rows)", cache_dir, len(frame))
+    return frame
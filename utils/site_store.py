@@ -0,0 +1,193 @@
+"""
+Site Store
+Per-site partitioned, date-sorted storage with binary-search range slicing
+"""
+
+import uuid
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+
+def date_bounds(start_date, end_date):
+    """
+    Turn date-picker values into a half-open timestamp range.
+
+    The end date is inclusive of its whole day, so '2021-06-30' selects up to
+    (but not including) 2021-07-01 00:00.
+
+    Returns:
+        tuple: (start, end) as pandas Timestamps, end exclusive
+    """
+    start = pd.Timestamp(start_date).normalize()
+    end = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+    return start, end
+
+
+class SiteStore:
+    """
+    Wide-format data with each site's rows contiguous and sorted by date.
+
+    Selecting a date range for a site is two binary searches over that
+    site's dates and returns a slice of the underlying frame, so cost scales
+    with the rows selected rather than with the size of the dataset.
+
+    Aggregates derived from the store (daily_cube, prefix_sums,
+    quantile_sketches, hourly_validity, calendar_aggregates, pyramid) are
+    built on first access and kept for the life of the store.
+
+    Attributes:
+        frame: The partitioned DataFrame (rows with no date or site are dropped)
+        sites: Site names in storage order
+        bounds: {site: (first row, last row + 1)} within frame
+        version: Identifies this load of the data, for cache keys
+    """
+
+    def __init__(self, wales_df, version=None):
+        # Filter, sort and reindex only where needed, so a frame that is
+        # already clean and in order (such as a shared store) isn't copied
+        keep = wales_df["date"].notna().to_numpy() & wales_df["site"].notna().to_numpy()
+        df = wales_df if keep.all() else wales_df[keep]
+
+        site = df["site"]
+        if not isinstance(site.dtype, pd.CategoricalDtype):
+            site = site.astype("category")
+        codes = site.cat.codes.to_numpy()
+        dates = df["date"].to_numpy(dtype="datetime64[ns]")
+
+        # Sort by site code, then date; skip the copy if already in order
+        order = np.lexsort((dates, codes))
+        if not np.array_equal(order, np.arange(len(order))):
+            df = df.take(order)
+            codes = codes[order]
+            dates = dates[order]
+        if not df.index.equals(pd.RangeIndex(len(df))):
+            df = df.reset_index(drop=True)
+        self.frame = df
+        self.dates = dates
+
+        # Partition boundaries are where the site code changes
+        starts = np.flatnonzero(np.diff(codes, prepend=-1)) if len(codes) else []
+        stops = np.r_[starts[1:], len(codes)] if len(codes) else []
+        categories = site.cat.categories
+
+        self.bounds = {
+            categories[codes[lo]]: (int(lo), int(hi))
+            for lo, hi in zip(starts, stops)
+        }
+        self.sites = list(self.bounds)
+        self.version = version or uuid.uuid4().hex
+        self._rolling = {}
+
+    @cached_property
+    def daily_cube(self):
+        """Site × day × pollutant aggregates (see utils.daily_cube)."""
+        from utils.daily_cube import DailyCube
+        return DailyCube(self)
+
+    @cached_property
+    def prefix_sums(self):
+        """Cumulative per-pollutant totals (see utils.prefix_sums)."""
+        from utils.prefix_sums import PrefixSums
+        return PrefixSums(self)
+
+    @cached_property
+    def quantile_sketches(self):
+        """Mergeable per-site quantile sketches (see utils.quantile_sketch)."""
+        from utils.quantile_sketch import QuantileSketches
+        return QuantileSketches(self)
+
+    @cached_property
+    def hourly_validity(self):
+        """Per-site hourly validity bitmaps (see utils.completeness)."""
+        from utils.completeness import HourlyValidity
+        return HourlyValidity(self)
+
+    @cached_property
+    def calendar_aggregates(self):
+        """Monthly and yearly totals (see utils.calendar_aggregates)."""
+        from utils.calendar_aggregates import CalendarAggregates
+        return CalendarAggregates(self.daily_cube)
+
+    @cached_property
+    def pyramid(self):
+        """Daily / weekly / monthly mean, min and max (see utils.pyramid)."""
+        from utils.pyramid import ResolutionPyramid
+        return ResolutionPyramid(self.daily_cube)
+
+    def rolling_mean(self, pollutant, window=8, min_valid=None):
+        """
+        Per-site rolling means over clock hours, aligned with frame's rows.
+
+        Computed once per (pollutant, window, min_valid) and reused.
+        """
+        from utils.rolling import MIN_VALID_HOURS, rolling_mean_hourly
+        if min_valid is None:
+            min_valid = MIN_VALID_HOURS
+
+        key = (pollutant, window, min_valid)
+        if key not in self._rolling:
+            values = self.frame[pollutant].to_numpy(dtype=np.float64)
+            out = np.full(len(values), np.nan)
+            for lo, hi in self.bounds.values():
+                out[lo:hi] = rolling_mean_hourly(
+                    self.dates[lo:hi], values[lo:hi], window, min_valid)
+            self._rolling[key] = out
+        return self._rolling[key]
+
+    def site_range(self, site, start, end):
+        """
+        Row positions of one site's readings in [start, end).
+
+        Args:
+            site: Site name
+            start, end: Timestamps, end exclusive (see date_bounds)
+
+        Returns:
+            tuple: (lo, hi) positions in frame; lo == hi when nothing matches
+        """
+        if site not in self.bounds:
+            return 0, 0
+        lo, hi = self.bounds[site]
+        site_dates = self.dates[lo:hi]
+        return (
+            lo + int(np.searchsorted(site_dates, np.datetime64(start), "left")),
+            lo + int(np.searchsorted(site_dates, np.datetime64(end), "left")),
+        )
+
+    def select_site(self, site, start_date, end_date):
+        """
+        One site's rows between two date-picker dates (end day inclusive).
+
+        Returns:
+            DataFrame: A zero-copy slice of frame
+        """
+        lo, hi = self.site_range(site, *date_bounds(start_date, end_date))
+        return self.frame.iloc[lo:hi]
+
+    def select(self, sites, start_date, end_date):
+        """
+        Rows for several sites between two date-picker dates (end day inclusive).
+
+        Args:
+            sites: Iterable of site names
+            start_date, end_date: Date-picker values
+
+        Returns:
+            DataFrame: Rows grouped by site in storage order, each site sorted
+            by date
+        """
+        start, end = date_bounds(start_date, end_date)
+        wanted = set(sites or [])
+        ranges = [
+            self.site_range(site, start, end)
+            for site in self.sites if site in wanted
+        ]
+        parts = [self.frame.iloc[lo:hi] for lo, hi in ranges if hi > lo]
+
+        if not parts:
+            return self.frame.iloc[0:0]
+        if len(parts) == 1:
+            return parts[0]
+        return pd.concat(parts)
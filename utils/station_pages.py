@@ -0,0 +1,124 @@
+"""
+Station Pages
+Sorting and pagination of the per-station results, with rendered pages
+cached and their neighbours prefetched in the background
+"""
+
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.dashboard_bundle import get_dashboard_bundle
+from utils.selection_cache import SelectionCache, selection_key
+
+
+# Cards per page
+STATION_PAGE_SIZE = 12
+
+SORT_ORDERS = {
+    'name': 'Site name',
+    'exceedance': 'Worst exceedance first',
+    'completeness': 'Lowest completeness first',
+}
+
+
+def exceedance_severity(cell):
+    """
+    How far a format_exceedance() cell is towards (or past) its limit.
+
+    Cells with nothing to rank - no rule, or a NaN mean for a site without
+    readings of the pollutant - are the least severe.
+    """
+    if cell['type'] == 'none' or not math.isfinite(cell['value']):
+        return -math.inf
+    if cell['limit'] > 0:
+        return cell['value'] / cell['limit']
+    return cell['value']
+
+
+def sort_site_results(results, order='name', standard='UK'):
+    """
+    SiteResults in display order; ties (and order='name') go by site name.
+
+    Args:
+        results: DashboardBundle.site_results
+        order: Key of SORT_ORDERS
+        standard: Standard whose exceedance to rank by
+
+    Returns:
+        list
+    """
+    results = sorted(results, key=lambda r: r.site)
+    if order == 'exceedance':
+        results.sort(key=lambda r: -exceedance_severity(r.exceedance[standard]))
+    elif order == 'completeness':
+        results.sort(key=lambda r: r.completeness)
+    return results
+
+
+def page_count(total, size=STATION_PAGE_SIZE):
+    return max(-(-total // size), 1)
+
+
+class StationPages:
+    """
+    Rendered pages of the station grid.
+
+    Only the requested page is rendered. Each request then queues its
+    neighbours on one background thread, so stepping through the grid is
+    normally served from the cache. Sorting needs every station's figures,
+    but those are cheap arrays in the dashboard bundle; rendering the
+    cards is the cost that scales with the number of stations.
+
+    Args:
+        store: SiteStore the bundles come from
+        render: Function (site_results, pollutant) -> children for a page
+        size: Cards per page
+        cache: SelectionCache for rendered pages
+    """
+
+    def __init__(self, store, render, size=STATION_PAGE_SIZE, cache=None):
+        self.store = store
+        self.render = render
+        self.size = size
+        self.cache = cache if cache is not None else SelectionCache(maxsize=64)
+        self._prefetcher = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="station-prefetch")
+
+    def get(self, request, standard='UK', order='name', page=0):
+        """
+        One page of the grid for a bundle_request() dict.
+
+        The standard only matters to the 'exceedance' order (every card
+        carries both standards' gauges), so other orders share one cached
+        page whichever standard is active.
+
+        Returns:
+            tuple: (children, page clamped to the valid range, page count,
+            number of stations)
+        """
+        bundle = get_dashboard_bundle(self.store, request)
+        total = len(bundle.site_results)
+        pages = page_count(total, self.size)
+        page = min(max(page, 0), pages - 1)
+        if order != 'exceedance':
+            standard = None
+
+        children = self._page(request, standard, order, page)
+        for neighbour in (page + 1, page - 1):
+            if 0 <= neighbour < pages:
+                self._prefetcher.submit(self._page, request, standard, order, neighbour)
+        return children, page, pages, total
+
+    def _page(self, request, standard, order, page):
+        key = selection_key(
+            request['sites'], request['pollutant'],
+            request['start_date'], request['end_date'], self.store.version,
+        ) + (standard, order, page, self.size)
+
+        def render():
+            bundle = get_dashboard_bundle(self.store, request)
+            results = sort_site_results(bundle.site_results, order, standard or 'UK')
+            start = page * self.size
+            return self.render(results[start:start + self.size], bundle.pollutant)
+
+        return self.cache.get(key, render)